@@ -5,461 +5,3487 @@ Date: January 2026
 Description: Demonstrates AI test generation using pre-built templates
 """
 
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime
+from http import HTTPStatus
+from itertools import islice
+from pathlib import Path
+from urllib.parse import urlsplit
+import argparse
+import ast
+import asyncio
+import cProfile
+import csv
+import gzip
+import hashlib
+import heapq
+import http.client
+import json
+import math
+import os
+import random
+import io
+import re
+import sys
+import tarfile
+import threading
 import time
+import zipfile
+
+# ============================================================================
+# SIMULATED AI LATENCY
+# ============================================================================
+
+# Default "AI thinking" time in seconds used by the interactive demo.
+# A number gives a fixed delay, a (min, max) tuple a random one, 0 disables it.
+SIMULATED_LATENCY = 2.0
+
+
+def parse_latency(text):
+    """Parse a latency setting: "0", "2" (fixed) or "0.5-3" (random range)"""
+    if "-" in text.strip("-"):
+        low, high = text.split("-", 1)
+        low, high = float(low), float(high)
+        if low < 0 or high < low:
+            raise ValueError(f"Invalid latency range: {text}")
+        return (low, high)
+    
+    value = float(text)
+    if value < 0:
+        raise ValueError(f"Latency cannot be negative: {text}")
+    return value
+
+
+def _latency_seconds(latency):
+    """Resolve a latency setting (None = SIMULATED_LATENCY) to a delay in seconds"""
+    if latency is None:
+        latency = SIMULATED_LATENCY
+    if isinstance(latency, (tuple, list)):
+        return random.uniform(*latency)
+    return float(latency)
+
+
+# ============================================================================
+# INSTRUMENTATION: PER-STAGE TIMINGS AND TEMPLATE COUNTERS
+# ============================================================================
+
+class StageMetrics:
+    """
+    Accumulates wall time per pipeline stage and selections per template
+    Stages used by the generator: latency (simulated AI delay), cache, match,
+    render, print (console output), write (saving files) and model (one call
+    to a model backend). Counters hold plain totals such as model tokens.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.stages = {}  # stage -> [calls, total seconds, max seconds]
+        self.templates = Counter()
+        self.counters = Counter()
+    
+    def record(self, stage, seconds):
+        """Add one timed call to a stage"""
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+    
+    @contextmanager
+    def timed(self, stage):
+        """Time the enclosed block as one call of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    def count_template(self, template_id):
+        self.templates[template_id] += 1
+    
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+    
+    def snapshot(self):
+        """Plain-dict copy of the metrics (picklable, JSON-serializable)"""
+        return {
+            "stages": {
+                stage: {"calls": calls, "total_seconds": total, "max_seconds": peak}
+                for stage, (calls, total, peak) in self.stages.items()
+            },
+            "templates": dict(self.templates),
+            "counters": dict(self.counters),
+        }
+    
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. from a worker process) into these metrics"""
+        for stage, row in snapshot["stages"].items():
+            entry = self.stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += row["calls"]
+            entry[1] += row["total_seconds"]
+            entry[2] = max(entry[2], row["max_seconds"])
+        self.templates.update(snapshot["templates"])
+        self.counters.update(snapshot.get("counters", {}))
+    
+    def summary_line(self):
+        """One-line stage breakdown for console reports"""
+        return " | ".join(
+            f"{stage} {total:.2f}s" for stage, (_, total, _) in self.stages.items()
+        )
+    
+    def write_json(self, path):
+        _write_text_atomic(path, json.dumps(self.snapshot(), indent=2) + "\n")
+    
+    def write_prometheus(self, path):
+        """Write a Prometheus textfile-collector file"""
+        lines = [
+            "# HELP generator_stage_calls_total Calls per generator stage.",
+            "# TYPE generator_stage_calls_total counter",
+        ]
+        lines += [f'generator_stage_calls_total{{stage="{stage}"}} {calls}'
+                  for stage, (calls, _, _) in self.stages.items()]
+        lines += [
+            "# HELP generator_stage_seconds_total Wall time spent per generator stage.",
+            "# TYPE generator_stage_seconds_total counter",
+        ]
+        lines += [f'generator_stage_seconds_total{{stage="{stage}"}} {total:.9f}'
+                  for stage, (_, total, _) in self.stages.items()]
+        lines += [
+            "# HELP generator_stage_max_seconds Slowest single call per generator stage.",
+            "# TYPE generator_stage_max_seconds gauge",
+        ]
+        lines += [f'generator_stage_max_seconds{{stage="{stage}"}} {peak:.9f}'
+                  for stage, (_, _, peak) in self.stages.items()]
+        lines += [
+            "# HELP generator_template_selections_total Descriptions resolved per template.",
+            "# TYPE generator_template_selections_total counter",
+        ]
+        lines += [f'generator_template_selections_total{{template="{template_id}"}} {count}'
+                  for template_id, count in sorted(self.templates.items())]
+        if self.counters:
+            lines += [
+                "# HELP generator_events_total Running totals such as model tokens and retries.",
+                "# TYPE generator_events_total counter",
+            ]
+            lines += [f'generator_events_total{{counter="{name}"}} {count}'
+                      for name, count in sorted(self.counters.items())]
+        _write_text_atomic(path, "\n".join(lines) + "\n")
+
+
+def _write_text_atomic(path, text):
+    """Write a file via temp-file-then-rename so readers never see it half-written"""
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+# Process-wide metrics, filled in by the generator as it runs
+METRICS = StageMetrics()
+
+
+# ============================================================================
+# GENERATION OPTIONS: HOW THE GENERATED CODE IS SHAPED
+# ============================================================================
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    """
+    Emission settings shared by every generated test
+    The defaults reproduce the classic output: one Chrome per test with a
+    10 second implicit wait. driver="shared" makes tests use a pooled,
+    session-scoped driver fixture from the emitted conftest.py instead;
+    waits="explicit" drops the implicit wait so only WebDriverWait waits,
+    with one module-level timeout and poll interval.
+    base_url_mode="per-worker" takes URLs from a base_url fixture instead of
+    hard-coding base_url, so each pytest-xdist worker can use its own app
+    instance; shards > 0 emits a balanced shard plan for the suite.
+    tier="fast" emits the HTTP-only variant of each template, which checks
+    the pages with a plain HTTP client and HTML parsing instead of a browser.
+    style="page-objects" emits browser tests that drive the app through the
+    page classes of an emitted pages.py instead of inlining locators; the
+    fast tier has no browser pages, so it ignores style.
+    step_timing=True adds a plugin to the emitted conftest.py that times each
+    navigation, element lookup and wait of the browser tests (see
+    load_step_timings / suggest_timeouts). result_cache=True adds one that
+    skips a test whose file, support files and app build are unchanged since
+    it passed.
+    """
+    driver: str = "per-test"
+    waits: str = "implicit"
+    timeout: float = 10
+    poll_interval: float = 0.5
+    base_url: str = "http://localhost:8080"
+    base_url_mode: str = "fixed"
+    shards: int = 0
+    tier: str = "browser"
+    style: str = "inline"
+    step_timing: bool = False
+    result_cache: bool = False
+    
+    def __post_init__(self):
+        if self.driver not in ("per-test", "shared"):
+            raise ValueError(f"Unknown driver mode: {self.driver}")
+        if self.waits not in ("implicit", "explicit"):
+            raise ValueError(f"Unknown wait mode: {self.waits}")
+        if self.timeout <= 0 or self.poll_interval <= 0:
+            raise ValueError("Wait timeout and poll interval must be positive")
+        if not re.fullmatch(r"https?://[^\s\"'{}\\]+", self.base_url):
+            raise ValueError(f"Invalid base URL: {self.base_url}")
+        if self.base_url_mode not in ("fixed", "per-worker"):
+            raise ValueError(f"Unknown base URL mode: {self.base_url_mode}")
+        if self.shards < 0:
+            raise ValueError("Shard count cannot be negative")
+        if self.tier not in ("browser", "fast"):
+            raise ValueError(f"Unknown test tier: {self.tier}")
+        if self.style not in ("inline", "page-objects"):
+            raise ValueError(f"Unknown test style: {self.style}")
+        if self.step_timing and self.tier != "browser":
+            raise ValueError("Step timing instruments Selenium and needs tier='browser'")
+    
+    def key(self):
+        """Stable string form, used in cache keys and manifests"""
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+DEFAULT_OPTIONS = GenerationOptions()
+
 
 # ============================================================================
 # MOCK AI: TEMPLATE-BASED TEST GENERATION
 # ============================================================================
 
-def generate_selenium_test_mock(test_description):
+def generate_selenium_test_mock(test_description, verbose=True, latency=None,
+                                options=DEFAULT_OPTIONS):
+    """
+    Simulates AI generation using intelligent templates
+    This demonstrates the concept without requiring OpenAI API
+
+    Set verbose=False to skip the progress banner (used by batch mode)
+    and latency=0 to skip the simulated thinking time; options is a
+    GenerationOptions controlling the shape of the emitted code
+    """
+    
+    if verbose:
+        with METRICS.timed("print"):
+            print("\n" + "="*70)
+            print("🤖 AI is generating your test code...")
+            print("="*70)
+            print(f"📝 Description: {test_description}")
+            print("⏳ Processing with AI model...\n")
+    
+    return _generate_test(test_description, latency, options)[1]
+
+
+def _generate_test(test_description, latency=None, options=DEFAULT_OPTIONS):
+    """Simulated AI call (a real one with a model backend); returns (template id, code)"""
+    if isinstance(_backend, TemplateBackend):
+        _simulate_latency(latency)
+    return _backend.generate(test_description, options)
+
+
+def _simulate_latency(latency):
+    delay = _latency_seconds(latency)
+    if delay > 0:
+        with METRICS.timed("latency"):
+            time.sleep(delay)
+
+
+def iter_generate(descriptions, latency=0, options=DEFAULT_OPTIONS, encoded=False):
+    """
+    Lazily generate tests, yielding (description, template_id, chunks)
+    chunks is a list of text segments that together form the test source;
+    pass it to write_chunks (or save_test_file) instead of joining it.
+    With encoded=True they are UTF-8 bytes (see render_encoded), for a
+    binary handle. Descriptions are pulled one at a time, so memory stays
+    flat for any number of them. A model backend sends them in batches
+    instead and takes no simulated latency.
+    """
+    if not isinstance(_backend, TemplateBackend):
+        for description, template_id, code in _backend.iter_generate(descriptions, options):
+            yield description, template_id, [code.encode("utf-8") if encoded else code]
+        return
+    
+    render = render_encoded if encoded else render_chunks
+    for description in descriptions:
+        _simulate_latency(latency)
+        if _render_cache is not None:
+            template_id, code = _render_cache.render(description, options, encoded)
+            yield description, template_id, code if encoded else [code]
+            continue
+        
+        started = time.perf_counter()
+        template_id = select_template(description)
+        matched = time.perf_counter()
+        chunks = render(template_id, description, options)[0]
+        METRICS.record("match", matched - started)
+        METRICS.record("render", time.perf_counter() - matched)
+        METRICS.count_template(template_id)
+        yield description, template_id, chunks
+
+
+def write_chunks(handle, chunks):
+    """
+    Stream a test's segments to an open handle without joining them
+    Text segments need a text handle, encoded ones a binary handle.
+    """
+    handle.writelines(chunks)
+
+
+async def agenerate_selenium_test(test_description, latency=None, options=DEFAULT_OPTIONS):
+    """
+    Asyncio variant of generate_selenium_test_mock
+    The simulated latency is awaited, so many calls overlap instead of serializing
+    """
+    return (await _agenerate_test(test_description, latency, options))[1]
+
+
+async def _agenerate_test(test_description, latency=None, options=DEFAULT_OPTIONS):
+    """Asyncio variant of _generate_test; returns (template id, code)"""
+    if not isinstance(_backend, TemplateBackend):
+        return await asyncio.wrap_future(_backend.submit(test_description, options))
+    
+    await _await_latency(latency)
+    return _render_test(test_description, options)
+
+
+async def _await_latency(latency):
+    """Asyncio variant of _simulate_latency"""
+    delay = _latency_seconds(latency)
+    if delay > 0:
+        with METRICS.timed("latency"):
+            await asyncio.sleep(delay)
+
+
+# ============================================================================
+# KEYWORD MATCHING: PICK THE BEST TEMPLATE IN A SINGLE PASS
+# ============================================================================
+
+class KeywordMatcher:
+    """
+    Precompiled multi-pattern matcher for template selection
+    All rule keywords go into one Aho-Corasick automaton, so a description is
+    scanned once no matter how many templates exist; an inverted index from
+    keyword to rules then scores only the templates that were actually hit.
+    """
+    
+    def __init__(self, rules):
+        self.template_ids = []
+        self.group_counts = []
+        keyword_ids = {}
+        postings = []  # keyword id -> [(rule index, group index), ...]
+        
+        for rule_index, (template_id, groups) in enumerate(rules):
+            self.template_ids.append(template_id)
+            self.group_counts.append(len(groups))
+            for group_index, group in enumerate(groups):
+                for keyword in group:
+                    keyword = keyword.lower()
+                    if keyword not in keyword_ids:
+                        keyword_ids[keyword] = len(postings)
+                        postings.append([])
+                    postings[keyword_ids[keyword]].append((rule_index, group_index))
+        
+        self.keywords = list(keyword_ids)
+        self.postings = postings
+        self._build_automaton()
+    
+    def _build_automaton(self):
+        """Build the goto/fail/output tables of the Aho-Corasick automaton"""
+        goto = [{}]
+        output = [()]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    output.append(())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            output[state] = output[state] + (keyword_id,)
+        
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] = output[next_state] + output[fail[next_state]]
+        
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+    
+    def find_keywords(self, text):
+        """Return the ids of all keywords occurring in text (one pass)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+    
+    def rank(self, text):
+        """
+        Return [(score, template_id), ...] for every candidate template,
+        best first. Score is the number of distinct rule keywords found;
+        ties go to the template listed first.
+        """
+        satisfied = {}
+        scores = {}
+        for keyword_id in self.find_keywords(text):
+            for rule_index, group_index in self.postings[keyword_id]:
+                satisfied.setdefault(rule_index, set()).add(group_index)
+                scores[rule_index] = scores.get(rule_index, 0) + 1
+        
+        candidates = [
+            (scores[rule_index], rule_index)
+            for rule_index, groups in satisfied.items()
+            if len(groups) == self.group_counts[rule_index]
+        ]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self.template_ids[rule_index]) for score, rule_index in candidates]
+    
+    def best(self, text, default=None):
+        """Return the highest-ranked template id, or default when nothing matches"""
+        ranked = self.rank(text)
+        return ranked[0][1] if ranked else default
+
+
+# ============================================================================
+# TEMPLATE REGISTRY: LAZY-LOADED, PRECOMPILED TEMPLATES
+# ============================================================================
+
+# Templates ship as files next to this script; templates.json lists them in
+# priority order with their keyword rules (see KeywordMatcher). Shared
+# snippets that depend on GenerationOptions live in templates/fragments/,
+# files emitted next to the tests (conftest.py, ...) in templates/support/.
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+TEMPLATE_MANIFEST = "templates.json"
+
+# Slot names a template may use; any other {text} is left untouched.
+# A name ending in ":" takes an argument: {url:/login} is the quoted URL
+# expression for the /login route (see _url_expression) and {app_url} the
+# expression for the base URL itself
+TEMPLATE_SLOTS = ("description", "stdlib_imports", "webdriver_import", "driver_lifecycle",
+                  "wait_args", "wait_config", "app_url", "url:")
+
+# Slot names used inside fragments and support files
+FRAGMENT_SLOTS = ("implicit_wait", "implicit_wait_seconds", "timeout", "poll_interval",
+                  "base_url")
+
+# Slot names used inside conftest.py parts: the fragment slots plus the
+# {test class: template} map the step-timing plugin files its timings under
+SUPPORT_SLOTS = FRAGMENT_SLOTS + ("template_classes",)
+
+# Seconds a test is assumed to take when its template has no estimate
+DEFAULT_TEST_SECONDS = 5.0
+
+
+class CompiledTemplate:
+    """
+    A template split into literal segments and slot positions
+    Rendering fills the slots and joins the parts, so the template text is
+    never scanned again after compilation.
+    """
+    
+    def __init__(self, template_id, source, slots=TEMPLATE_SLOTS, mtime=None):
+        self.template_id = template_id
+        self.mtime = mtime
+        self.version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+        
+        pattern = re.compile("|".join(
+            re.escape("{" + name) + r'[^{}\s"]*\}' if name.endswith(":")
+            else re.escape("{" + name + "}")
+            for name in slots
+        ))
+        parts = []
+        slot_positions = []
+        position = 0
+        for match in pattern.finditer(source) if slots else ():
+            parts.append(source[position:match.start()])
+            name, colon, argument = match.group()[1:-1].partition(":")
+            slot_positions.append((len(parts), name, argument if colon else None))
+            parts.append(None)
+            position = match.end()
+        parts.append(source[position:])
+        
+        self.parts = tuple(parts)
+        self.encoded_parts = tuple(part if part is None else part.encode("utf-8")
+                                   for part in parts)
+        self.slot_positions = tuple(slot_positions)
+    
+    def chunks(self, values):
+        """
+        The literal segments with the slot values filled in, not yet joined
+        The value of a slot that takes an argument is a function of it
+        """
+        return self._fill(list(self.parts), values)
+    
+    def encoded_chunks(self, values):
+        """
+        Like chunks, but as UTF-8 bytes for a binary writer
+        The literal segments are the ones encoded at compile time, shared by
+        every render; values must already be bytes (or functions returning bytes)
+        """
+        return self._fill(list(self.encoded_parts), values)
+    
+    def _fill(self, parts, values):
+        for index, name, argument in self.slot_positions:
+            value = values[name]
+            parts[index] = value if argument is None else value(argument)
+        return parts
+    
+    def render(self, values):
+        """Join the literal segments with the slot values filled in"""
+        return "".join(self.chunks(values))
+
+
+class TemplateRegistry:
+    """
+    Loads templates from a directory on demand
+    Only the manifest is read up front; each template file is read and
+    compiled the first time it is used, and recompiled when its mtime changes.
+    Files are checked for changes at most once per check_interval seconds.
+    """
+    
+    def __init__(self, directory=TEMPLATE_DIR, auto_reload=True, check_interval=1.0):
+        self.directory = Path(directory)
+        self.auto_reload = auto_reload
+        self.check_interval = check_interval
+        self._checked = {}  # key -> time.monotonic() of the last mtime check
+        self.generation = 0  # bumped whenever anything is (re)compiled
+        self._manifest_mtime = None
+        self._entries = {}
+        self._compiled = {}
+        self._matcher = None
+        self.default_id = None
+        self.rules_version = None
+    
+    def _recently_checked(self, key):
+        """True when key was checked for changes within check_interval"""
+        now = time.monotonic()
+        last = self._checked.get(key)
+        if last is not None and now - last < self.check_interval:
+            return True
+        self._checked[key] = now
+        return False
+    
+    def stamp(self):
+        """A marker for unchanged_since: the current generation and time"""
+        return self.generation, time.monotonic()
+    
+    def unchanged_since(self, stamp):
+        """
+        True when nothing was recompiled since stamp and no file is due for
+        a change check yet, so anything derived from compiled files is current
+        """
+        generation, checked = stamp
+        return generation == self.generation and (
+            not self.auto_reload or time.monotonic() - checked < self.check_interval
+        )
+    
+    def _load_manifest(self):
+        """(Re)read the manifest when it is new or changed on disk"""
+        if self._manifest_mtime is not None:
+            if not self.auto_reload or self._recently_checked(TEMPLATE_MANIFEST):
+                return
+        path = self.directory / TEMPLATE_MANIFEST
+        mtime = path.stat().st_mtime_ns
+        if mtime == self._manifest_mtime:
+            return
+        
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        
+        entries = {entry["id"]: entry for entry in manifest["templates"]}
+        if manifest["default"] not in entries:
+            raise ValueError(f"Default template '{manifest['default']}' is not listed")
+        
+        self._entries = entries
+        self._compiled = {}
+        self.generation += 1
+        self._checked = {TEMPLATE_MANIFEST: time.monotonic()}
+        self._matcher = KeywordMatcher(self._rules())
+        self.default_id = manifest["default"]
+        # Changes whenever template selection could change
+        selection = json.dumps([self._rules(), self.default_id], sort_keys=True)
+        self.rules_version = hashlib.sha1(selection.encode("utf-8")).hexdigest()[:12]
+        self._manifest_mtime = mtime
+    
+    def rules(self):
+        """Keyword rules as [(template_id, keyword groups), ...] in priority order"""
+        self._load_manifest()
+        return self._rules()
+    
+    def _rules(self):
+        return [
+            (entry["id"], entry["keywords"])
+            for entry in self._entries.values()
+            if entry.get("keywords")
+        ]
+    
+    def template_ids(self):
+        """All registered template ids, in priority order"""
+        self._load_manifest()
+        return list(self._entries)
+    
+    def estimated_seconds(self, template_id):
+        """Expected run time of a test from this template (manifest estimate)"""
+        self._load_manifest()
+        entry = self._entries.get(template_id, {})
+        return float(entry.get("estimated_seconds", DEFAULT_TEST_SECONDS))
+    
+    def declared_targets(self, template_id):
+        """Extra routes and elements the manifest lists for a template"""
+        self._load_manifest()
+        entry = self._entries.get(template_id, {})
+        return entry.get("routes", []), entry.get("elements", [])
+    
+    def get(self, template_id, tier="browser", style="inline"):
+        """
+        Return the compiled template, loading or reloading it if needed
+        tier="fast" returns the template's HTTP-only variant (its fast_file)
+        and style="page-objects" its page-object variant (its pages_file),
+        each falling back to the classic template when it has none
+        """
+        self._load_manifest()
+        if template_id not in self._entries:
+            raise KeyError(f"Unknown template: {template_id}")
+        
+        entry = self._entries[template_id]
+        slots = entry.get("slots", TEMPLATE_SLOTS)
+        if tier == "fast" and entry.get("fast_file"):
+            return self._load(("fast", template_id), entry["fast_file"], slots)
+        if tier == "browser" and style == "page-objects" and entry.get("pages_file"):
+            return self._load(("pages", template_id), entry["pages_file"], slots)
+        return self._load(template_id, entry["file"], slots)
+    
+    def fragment(self, name, slots=()):
+        """Return a compiled file from templates/fragments/"""
+        self._load_manifest()
+        return self._load(("fragment", name), f"fragments/{name}", slots)
+    
+    def support(self, name, slots=()):
+        """Return a compiled file from templates/support/"""
+        self._load_manifest()
+        return self._load(("support", name), f"support/{name}", slots)
+    
+    def _load(self, key, relative_path, slots):
+        """Compile a file on first use and again whenever its mtime changes"""
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            if not self.auto_reload or self._recently_checked(key):
+                return compiled
+        
+        path = self.directory / relative_path
+        mtime = path.stat().st_mtime_ns
+        if compiled is None or compiled.mtime != mtime:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                source = f.read()
+            template_id = key if isinstance(key, str) else key[1]
+            compiled = CompiledTemplate(template_id, source, slots, mtime)
+            self._compiled[key] = compiled
+            self.generation += 1
+        return compiled
+    
+    def rank(self, test_description):
+        """Rank all candidate templates for a description, best first"""
+        self._load_manifest()
+        return self._matcher.rank(test_description)
+    
+    def select(self, test_description):
+        """Return the id of the best template for a description"""
+        self._load_manifest()
+        return self._matcher.best(test_description, self.default_id)
+    
+    def current_rules_version(self):
+        """Version of the keyword rules, reloading the manifest if it changed"""
+        self._load_manifest()
+        return self.rules_version
+
+
+REGISTRY = TemplateRegistry()
+
+
+def rank_templates(test_description):
+    """Rank all candidate templates for a description, best first"""
+    return REGISTRY.rank(test_description)
+
+
+def select_template(test_description):
+    """Return the id of the best template for a description"""
+    return REGISTRY.select(test_description)
+
+
+# ============================================================================
+# RENDERING WITH GENERATION OPTIONS
+# ============================================================================
+
+def _option_fragments(options):
+    """Fragment files that fill each option-dependent slot, joined in order"""
+    if options.tier == "fast":
+        lifecycle = ["client_per_test.py.tmpl"]
+    elif options.driver == "shared":
+        lifecycle = ["driver_shared.py.tmpl"]
+    else:
+        lifecycle = ["driver_per_test.py.tmpl"]
+    if options.base_url_mode == "per-worker":
+        lifecycle.append("base_url_fixture.py.tmpl")
+    return {
+        "driver_lifecycle": lifecycle,
+        "wait_config": ["wait_explicit.py.tmpl"]
+                       if options.waits == "explicit" and options.tier == "browser" else [],
+    }
+
+
+def _url_expression(options):
+    """The {url:route} slot value: route -> Python expression for its URL"""
+    if options.base_url_mode == "per-worker":
+        return lambda route: f'f"{{self.base_url}}{route}"'
+    base_url = options.base_url.rstrip("/")
+    return lambda route: f'"{base_url}{route}"'
+
+
+def _app_url_expression(options):
+    """The {app_url} slot value: Python expression for the base URL itself"""
+    if options.base_url_mode == "per-worker":
+        return "self.base_url"
+    return f'"{options.base_url.rstrip("/")}"'
+
+
+def _option_scalars(options):
+    """Plain slot values derived from the options"""
+    timeout = f"{options.timeout:g}"
+    values = {
+        "implicit_wait": f"\n        self.driver.implicitly_wait({timeout})",
+        "implicit_wait_seconds": timeout,
+        "timeout": timeout,
+        "poll_interval": f"{options.poll_interval:g}",
+        "wait_args": timeout,
+        "base_url": options.base_url.rstrip("/"),
+        "app_url": _app_url_expression(options),
+        "url": _url_expression(options),
+    }
+    # Only a test that starts its own Chrome needs webdriver; a shared driver
+    # comes from the conftest.py fixture
+    if options.tier == "browser" and options.driver == "per-test":
+        values["webdriver_import"] = "from selenium import webdriver\n"
+    else:
+        values["webdriver_import"] = ""
+    if options.waits == "explicit" and options.tier == "browser":
+        # Read by the wait_explicit fragment; kept above the third-party imports
+        values["stdlib_imports"] = "import os\n\n"
+    else:
+        values["stdlib_imports"] = ""
+    if options.waits == "explicit":
+        values["implicit_wait"] = ""
+        values["implicit_wait_seconds"] = "0"
+        values["wait_args"] = "WAIT_TIMEOUT, poll_frequency=POLL_INTERVAL"
+    return values
+
+
+# options -> (fragments used, slot values, version, registry stamp); rebuilt when
+# a fragment reloads
+_option_values_cache = {}
+
+
+def _option_values(options):
+    """
+    Slot values that depend only on the options, plus a version string that
+    changes whenever one of the fragments they come from is edited
+    Between the registry's file checks the cached values are returned as is.
+    """
+    cached = _option_values_cache.get(options)
+    if cached is not None and REGISTRY.unchanged_since(cached[3]):
+        return dict(cached[1]), cached[2]
+    
+    fragments = [
+        (slot, [REGISTRY.fragment(name, FRAGMENT_SLOTS) for name in names])
+        for slot, names in _option_fragments(options).items()
+    ]
+    loaded = [fragment for _, group in fragments for fragment in group]
+    if cached is not None and len(cached[0]) == len(loaded) and all(
+        old is new for old, new in zip(cached[0], loaded)
+    ):
+        _option_values_cache[options] = cached[:3] + (REGISTRY.stamp(),)
+        return dict(cached[1]), cached[2]
+    
+    values = _option_scalars(options)
+    for slot, group in fragments:
+        values[slot] = "\n    \n".join(fragment.render(values) for fragment in group)
+    versions = " ".join(fragment.version for fragment in loaded)
+    version = hashlib.sha1(versions.encode("utf-8")).hexdigest()[:8]
+    _option_values_cache[options] = (loaded, values, version, REGISTRY.stamp())
+    return dict(values), version
+
+
+# options -> (version, slot values encoded to UTF-8); see _encoded_option_values
+_encoded_values_cache = {}
+
+
+def _encoded_option_values(options):
+    """
+    _option_values encoded to UTF-8, once per options and fragment version
+    A slot that takes an argument becomes a function returning bytes, which
+    encodes each argument's value only the first time
+    """
+    values, version = _option_values(options)
+    cached = _encoded_values_cache.get(options)
+    if cached is not None and cached[0] == version:
+        return dict(cached[1]), version
+    
+    encoded = {}
+    for name, value in values.items():
+        encoded[name] = _memoized_encoder(value) if callable(value) else value.encode("utf-8")
+    _encoded_values_cache[options] = (version, encoded)
+    return dict(encoded), version
+
+
+def _memoized_encoder(function):
+    """argument -> function(argument) encoded to UTF-8, computed once per argument"""
+    memo = {}
+    
+    def encoded(argument):
+        value = memo.get(argument)
+        if value is None:
+            value = memo[argument] = function(argument).encode("utf-8")
+        return value
+    return encoded
+
+
+def render_template(template_id, test_description, options=DEFAULT_OPTIONS):
+    """Render one template; returns (code, version of everything it came from)"""
+    chunks, version = render_chunks(template_id, test_description, options)
+    return "".join(chunks), version
+
+
+def render_chunks(template_id, test_description, options=DEFAULT_OPTIONS):
+    """Like render_template, but returns the code as a list of unjoined segments"""
+    template = REGISTRY.get(template_id, options.tier, options.style)
+    values, fragments_version = _option_values(options)
+    values["description"] = test_description
+    return template.chunks(values), f"{template.version}.{fragments_version}"
+
+
+def render_encoded(template_id, test_description, options=DEFAULT_OPTIONS):
+    """
+    Like render_chunks, but the segments are UTF-8 bytes for a binary writer
+    Literal segments are encoded when the template is compiled and
+    option-derived slots once per options, so each render encodes only the
+    description and allocates nothing but the segment list.
+    """
+    template = REGISTRY.get(template_id, options.tier, options.style)
+    values, fragments_version = _encoded_option_values(options)
+    values["description"] = test_description.encode("utf-8")
+    return template.encoded_chunks(values), f"{template.version}.{fragments_version}"
+
+
+def current_version(template_id, options=DEFAULT_OPTIONS):
+    """The version render_template would report right now, or None if unknown"""
+    try:
+        template = REGISTRY.get(template_id, options.tier, options.style)
+    except KeyError:
+        return None
+    return f"{template.version}.{_option_values(options)[1]}"
+
+
+def _render_test(test_description, options=DEFAULT_OPTIONS):
+    """
+    Selects the matching template and fills in the description
+    Returns (template id, code)
+    """
+    if _render_cache is not None:
+        return _render_cache.render(test_description, options)
+    template_id, _, code = _select_and_render(test_description, options)
+    return template_id, code
+
+
+def _select_and_render(test_description, options=DEFAULT_OPTIONS, encoded=False):
+    """
+    Match and render without the cache; returns (template id, version, code)
+    encoded=True returns the code as UTF-8 segments (see render_encoded)
+    """
+    started = time.perf_counter()
+    template_id = select_template(test_description)
+    matched = time.perf_counter()
+    if encoded:
+        code, version = render_encoded(template_id, test_description, options)
+    else:
+        code, version = render_template(template_id, test_description, options)
+    
+    METRICS.record("match", matched - started)
+    METRICS.record("render", time.perf_counter() - matched)
+    METRICS.count_template(template_id)
+    return template_id, version, code
+
+
+# ============================================================================
+# SUPPORT FILES EMITTED NEXT TO THE TESTS
+# ============================================================================
+
+def support_files(options=DEFAULT_OPTIONS):
+    """
+    Files the generated tests need besides themselves, as {name: text}
+    The classic per-test output needs none. The shared driver pool, the
+    per-worker base URL, shard selection, step timing and the result cache
+    each add a part to conftest.py;
+    fast-tier tests import their HTTP client from fast_client.py and
+    page-object tests their page classes from pages.py.
+    """
+    files = {}
+    if options.tier == "fast":
+        files["fast_client.py"] = REGISTRY.support("fast_client.py.tmpl").render({})
+    elif options.style == "page-objects":
+        files["pages.py"] = REGISTRY.support("pages.py.tmpl").render({})
+    
+    parts = []
+    if options.driver == "shared" and options.tier == "browser":
+        parts.append("conftest_driver_pool.py.tmpl")
+    if options.base_url_mode == "per-worker":
+        parts.append("conftest_base_url.py.tmpl")
+    if options.shards:
+        parts.append("conftest_shards.py.tmpl")
+    if options.step_timing:
+        parts.append("conftest_step_timing.py.tmpl")
+    if options.result_cache:
+        parts.append("conftest_result_cache.py.tmpl")
+    if parts:
+        values = _option_values(options)[0]
+        values["template_classes"] = json.dumps(_template_classes(options), indent=4)
+        header = REGISTRY.support("conftest_header.py.tmpl").render({})
+        sources = [REGISTRY.support(name, SUPPORT_SLOTS).render(values) for name in parts]
+        files["conftest.py"] = _merge_python_sources(header, sources)
+    return files
+
+
+def _template_classes(options=DEFAULT_OPTIONS):
+    """{test class name: template id} for the tests these options produce"""
+    return {
+        _first_class_name(render_template(template_id, "", options)[0]): template_id
+        for template_id in REGISTRY.template_ids()
+    }
+
+
+def _merge_python_sources(header, sources):
+    """
+    Join module sources behind one header: their leading import blocks are
+    merged (standard library first, duplicates dropped) and the rest follows
+    """
+    stdlib, third_party, bodies = [], [], []
+    for source in sources:
+        lines = source.split("\n")
+        index = 0
+        while index < len(lines) and (
+            not lines[index] or lines[index].startswith(("import ", "from "))
+        ):
+            line = lines[index]
+            if line:
+                module = line.split()[1].split(".")[0]
+                group = stdlib if module in sys.stdlib_module_names else third_party
+                if line not in group:
+                    group.append(line)
+            index += 1
+        bodies.append("\n".join(lines[index:]).strip("\n"))
+    
+    imports = "\n\n".join(
+        "\n".join(sorted(group, key=lambda line: (line.startswith("from "), line)))
+        for group in (stdlib, third_party) if group
+    )
+    return "\n\n\n".join([f"{header.rstrip()}\n\n{imports}"] + bodies) + "\n"
+
+
+def write_support_files(output_dir, options=DEFAULT_OPTIONS):
+    """Write support_files() atomically into output_dir; returns their paths"""
+    paths = []
+    for name, text in support_files(options).items():
+        path = Path(output_dir) / name
+        _write_text_atomic(path, text)
+        paths.append(str(path))
+    return paths
+
+
+# ============================================================================
+# SHARDING: BALANCED PARTITIONS FOR PARALLEL RUNS
+# ============================================================================
+
+SHARD_PLAN = "shards.json"
+
+
+def _collection_key(name):
+    """
+    How the emitted conftest.py identifies a generated test: its file name,
+    or "module.py::Class" for a test packed into a module
+    """
+    module, separator, class_name = name.partition("::")
+    if not separator:
+        module = module.rsplit(":", 1)[-1]  # "archive.zip:member.py"
+    return Path(module).name + separator + class_name
+
+
+def load_durations(path):
+    """
+    Read recorded test durations as {test key: seconds}
+    path is a JSON file mapping pytest node ids (or file names) to seconds, or a
+    directory of such files, like the .durations/ folder the emitted conftest.py
+    fills with --record-durations. Times are summed per file and per class.
+    """
+    path = Path(path)
+    recorded = {}
+    for file in sorted(path.glob("*.json")) if path.is_dir() else [path]:
+        with open(file, "r", encoding="utf-8") as f:
+            recorded.update(json.load(f))
+    
+    durations = {}
+    for node_id, seconds in recorded.items():
+        parts = node_id.split("::")
+        module = Path(parts[0]).name
+        keys = [module, f"{module}::{parts[1]}"] if len(parts) > 2 else [module]
+        for key in keys:
+            durations[key] = durations.get(key, 0.0) + float(seconds)
+    return durations
+
+
+def plan_shards(tests, shards, durations=None):
+    """
+    Split generated tests into `shards` groups of about equal run time
+    tests is [(name, template_id), ...]; a parametrized module is given as
+    (name, template_id, cases) and placed whole. A test counts with its
+    recorded duration when there is one, else with its template's estimate
+    (times its cases). Longest
+    tests are placed first, each on the currently lightest shard (LPT), which
+    stays within 4/3 of the best possible split. Returns the shards.json data.
+    """
+    durations = durations or {}
+    keys = []
+    weights = []
+    for name, template_id, *cases in tests:
+        key = _collection_key(name)
+        seconds = durations.get(key)
+        if seconds is None:
+            seconds = REGISTRY.estimated_seconds(template_id) * (cases[0] if cases else 1)
+        keys.append(key)
+        weights.append(seconds)
+    
+    loads = [(0.0, shard) for shard in range(shards)]
+    totals = [0.0] * shards
+    counts = [0] * shards
+    assigned = [0] * len(keys)
+    for index in sorted(range(len(keys)), key=lambda i: (-weights[i], keys[i])):
+        load, shard = heapq.heappop(loads)
+        assigned[index] = shard
+        totals[shard] += weights[index]
+        counts[shard] += 1
+        heapq.heappush(loads, (load + weights[index], shard))
+    
+    return {
+        "version": 1,
+        "shards": shards,
+        "tests": counts,
+        "estimated_seconds": [round(total, 3) for total in totals],
+        "assignments": dict(zip(keys, assigned)),
+    }
+
+
+def shard_plan_text(tests, shards, durations=None):
+    """shards.json contents for the generated tests"""
+    return json.dumps(plan_shards(tests, shards, durations), indent=1) + "\n"
+
+
+# ============================================================================
+# STEP TIMINGS: PER-TEMPLATE WAIT TIMEOUTS FROM RECORDED RUNS
+# ============================================================================
+
+# Steps a wait timeout applies to: lookups under an implicit wait and
+# WebDriverWait waits (page loads have their own timeout)
+TIMEOUT_STEPS = ("lookup", "wait")
+
+
+def load_step_timings(path):
+    """
+    Read step timings recorded by the emitted conftest.py (--step-timing)
+    path is one report or a directory of them, like the .step-timings/ folder
+    with one file per pytest-xdist worker. Counts and totals are added up and
+    the slowest times kept. Returns the merged report.
+    """
+    path = Path(path)
+    merged = {"version": 1, "timeout": None, "templates": {}}
+    for file in sorted(path.glob("*.json")) if path.is_dir() else [path]:
+        with open(file, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("timeout") is not None:
+            merged["timeout"] = max(merged["timeout"] or 0, report["timeout"])
+        for template_id, recorded in report["templates"].items():
+            entry = merged["templates"].setdefault(
+                template_id, {"tests": 0, "steps": {}, "locators": {}})
+            entry["tests"] += recorded["tests"]
+            _merge_step_stats(entry["steps"], recorded["steps"])
+            for target, steps in recorded["locators"].items():
+                _merge_step_stats(entry["locators"].setdefault(target, {}), steps)
+    return merged
+
+
+def _merge_step_stats(into, steps):
+    """Add {step kind: stats} into another such dict"""
+    for kind, stats in steps.items():
+        entry = into.setdefault(kind, {"count": 0, "total_seconds": 0.0,
+                                       "max_seconds": 0.0, "timeouts": 0})
+        entry["count"] += stats["count"]
+        entry["total_seconds"] += stats["total_seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], stats["max_seconds"])
+        entry["timeouts"] += stats["timeouts"]
+
+
+def suggest_timeouts(timings, current=None, headroom=2.0, minimum=1.0):
+    """
+    Per-template wait timeouts from step timings (see load_step_timings)
+    A template's timeout has to cover its slowest lookup or wait. The
+    suggestion is that time times headroom, rounded up to half a second, at
+    least minimum and at most the current timeout (the one the suite ran with
+    unless given). A template with a step that timed out keeps the current
+    timeout. Returns {template_id: suggestion} with the slowest step, ordered
+    by template id.
+    """
+    if current is None:
+        current = timings.get("timeout") or DEFAULT_OPTIONS.timeout
+    suggestions = {}
+    for template_id, entry in sorted(timings["templates"].items()):
+        slowest, slowest_step, timeouts, steps = 0.0, None, 0, 0
+        for target, kinds in entry["locators"].items():
+            for kind in TIMEOUT_STEPS:
+                stats = kinds.get(kind)
+                if stats is None:
+                    continue
+                steps += stats["count"]
+                timeouts += stats["timeouts"]
+                if slowest_step is None or stats["max_seconds"] > slowest:
+                    slowest, slowest_step = stats["max_seconds"], f"{kind} {target}"
+        if timeouts:
+            timeout = current
+        else:
+            timeout = min(current, max(minimum, math.ceil(slowest * headroom * 2) / 2))
+        suggestions[template_id] = {
+            "timeout": timeout,
+            "current": current,
+            "tests": entry["tests"],
+            "steps": steps,
+            "timeouts": timeouts,
+            "slowest_seconds": round(slowest, 3),
+            "slowest_step": slowest_step,
+        }
+    return suggestions
+
+
+# ============================================================================
+# RENDER CACHE: SKIP MATCHING AND RENDERING FOR REPEATED DESCRIPTIONS
+# ============================================================================
+
+def normalize_description(test_description):
+    """Fold case, whitespace and punctuation so trivial edits share a cache key"""
+    folded = re.sub(r"[^\w\s]", " ", test_description.lower())
+    return " ".join(folded.split())
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered tests, with an optional on-disk tier
+    Entries are keyed on the normalized description (plus the generation
+    options) and remember the template id and version and the keyword rules
+    version they were rendered with; an entry whose template or rules have
+    changed since is treated as a miss. When a hit was stored for a
+    differently worded description, only the (cheap) render is redone.
+    """
+    
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def stats(self):
+        """Hit/miss counters as a dict"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def _disk_path(self, key):
+        return self.directory / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+    
+    def _load_from_disk(self, key):
+        """Read an entry from the disk tier, or None"""
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return (record["template_id"], record["version"], record.get("rules_version"),
+                record["description"], record["code"])
+    
+    def _save_to_disk(self, key, entry):
+        """Write an entry atomically so concurrent processes never see half a file"""
+        template_id, version, rules_version, description, code = entry
+        path = self._disk_path(key)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"template_id": template_id, "version": version,
+                       "rules_version": rules_version,
+                       "description": description, "code": code}, f)
+        os.replace(temp_path, path)
+    
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def _lookup(self, key, options, rules_version):
+        """Find a still-valid entry in memory, then on disk"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        
+        if entry is not None:
+            template_id, version = entry[0], entry[1]
+            if entry[2] != rules_version or current_version(template_id, options) != version:
+                entry = None
+        return entry
+    
+    def render(self, test_description, options=DEFAULT_OPTIONS, encoded=False):
+        """
+        Return (template id, rendered test) for a description, using the cache
+        With encoded=True the test comes back as UTF-8 segments from
+        render_encoded: a hit then saves the template match and the segments
+        are filled in fresh, never re-encoded from the cached text.
+        """
+        started = time.perf_counter()
+        key = normalize_description(test_description)
+        if options != DEFAULT_OPTIONS:
+            key = f"{key}|{options.key()}"
+        rules_version = REGISTRY.current_rules_version()
+        entry = self._lookup(key, options, rules_version)
+        METRICS.record("cache", time.perf_counter() - started)
+        
+        if entry is not None:
+            self.hits += 1
+            template_id, _, _, description, code = entry
+            METRICS.count_template(template_id)
+            if description == test_description and code is not None and not encoded:
+                return template_id, code
+            renderer = render_encoded if encoded else render_template
+            with METRICS.timed("render"):
+                return template_id, renderer(template_id, test_description, options)[0]
+        
+        self.misses += 1
+        template_id, version, code = _select_and_render(test_description, options, encoded)
+        text = code
+        if encoded:
+            # Only the disk tier needs the text; in memory the template id is enough
+            text = b"".join(code).decode("utf-8") if self.directory is not None else None
+        entry = (template_id, version, rules_version, test_description, text)
+        self._remember(key, entry)
+        if self.directory is not None:
+            self._save_to_disk(key, entry)
+        return template_id, code
+
+
+# Process-wide cache used by generate_selenium_test_mock (None = disabled)
+_render_cache = None
+
+
+def configure_render_cache(maxsize=1024, directory=None):
+    """
+    Enable (maxsize > 0) or disable the render cache for this process
+    Returns the new cache, or None when disabled
+    """
+    global _render_cache
+    if maxsize > 0:
+        _render_cache = RenderCache(maxsize, directory)
+    else:
+        _render_cache = None
+    return _render_cache
+
+
+def _render_cache_config():
+    """Arguments that recreate the current cache setup in a worker process"""
+    if _render_cache is None:
+        return (0, None)
+    return (_render_cache.maxsize, _render_cache.directory)
+
+
+# ============================================================================
+# NEAR-DUPLICATE DESCRIPTIONS: GROUP REWORDED SCENARIOS
+# ============================================================================
+
+# Spellings folded together before descriptions are compared. Phrases are
+# replaced first, then single words (a word may stand for several)
+SYNONYM_PHRASES = {
+    "log in": "login", "logging in": "login", "logged in": "login", "sign in": "login",
+    "signing in": "login", "log out": "logout", "logging out": "logout",
+    "sign out": "logout", "signing out": "logout", "sign up": "register",
+    "signing up": "register", "error message": "error", "warning message": "warning",
+    "add to cart": "cart add", "adding to cart": "cart add",
+}
+SYNONYMS = {
+    "signin": "login", "logon": "login", "authenticate": "login",
+    "signout": "logout", "logoff": "logout",
+    "signup": "register", "registration": "register", "registering": "register",
+    "wrong": "invalid", "incorrect": "invalid", "bad": "invalid", "unknown": "invalid",
+    "credentials": "username password", "login details": "username password",
+    "blank": "empty", "missing": "empty", "without": "empty",
+    "basket": "cart", "bag": "cart", "adding": "add", "added": "add", "adds": "add",
+    "find": "search", "searching": "search", "query": "search",
+    "displays": "shows", "show": "shows", "displayed": "shows", "appears": "shows",
+    "errors": "error", "warnings": "warning", "messages": "message",
+    "fields": "field", "forms": "form", "items": "item", "products": "item",
+    "product": "item", "clicking": "click", "clicks": "click", "pressing": "click",
+    "press": "click", "submitting": "submit", "submits": "submit",
+    "homepage": "home", "entering": "enter", "enters": "enter", "typing": "enter",
+    "user": "", "users": "", "correctly": "", "properly": "",
+}
+STOPWORDS = frozenset("""
+    a an the and or to of on in at for with by from into after before when then
+    that this is are be it its any test tests testing verify verifies check checks
+    ensure ensures should will can page button
+""".split())
+
+_SYNONYM_PHRASE = re.compile(
+    r"\b(" + "|".join(re.escape(phrase) for phrase in
+                      sorted(SYNONYM_PHRASES, key=len, reverse=True)) + r")\b"
+)
+
+
+def description_tokens(test_description):
+    """Content words of a description, lowercased with synonyms folded"""
+    text = _SYNONYM_PHRASE.sub(lambda match: SYNONYM_PHRASES[match.group(1)],
+                               normalize_description(test_description))
+    tokens = []
+    for word in text.split():
+        for token in SYNONYMS.get(word, word).split():
+            if token not in STOPWORDS:
+                tokens.append(token)
+    return tokens
+
+
+def description_shingles(test_description, size=1):
+    """
+    Word shingles of a description: every run of 1 to size content words
+    The default (single words) ignores word order, which suits short
+    descriptions; size=2 also counts adjacent pairs.
+    """
+    tokens = description_tokens(test_description)
+    return {" ".join(tokens[start:start + length])
+            for length in range(1, size + 1)
+            for start in range(len(tokens) - length + 1)}
+
+
+# Words that turn a description into a different scenario, however many
+# other words it shares ("can upload" / "cannot upload", "adding" /
+# "removing"). "t" is what is left of n't once punctuation is folded, and
+# "empty" is what "without" and "missing" fold to.
+NEGATION_WORDS = frozenset("not no cannot never none nothing nobody neither nor t empty".split())
+ACTION_VERBS = """
+    add remove delete upload download create edit update save cancel submit reset
+    open close show hide enable disable accept reject approve allow lock unlock
+    select deselect expand collapse follow unfollow subscribe unsubscribe
+    increase decrease
+""".split()
+
+
+def _verb_forms(verb):
+    stem = verb[:-1] if verb.endswith("e") else verb
+    return {verb: verb, verb + "s": verb, stem + "ed": verb, stem + "ing": verb}
+
+
+ACTION_WORDS = {form: verb for verb in ACTION_VERBS for form, verb in _verb_forms(verb).items()}
+
+
+def description_contrasts(test_description):
+    """Negation words and action verbs (as their base form) of a description"""
+    contrasts = set()
+    for token in description_tokens(test_description):
+        if token in NEGATION_WORDS:
+            contrasts.add(token)
+        elif token in ACTION_WORDS:
+            contrasts.add(ACTION_WORDS[token])
+    return frozenset(contrasts)
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index for finding descriptions similar to a new one
+    Each entry's shingle set is summarized by num_perm MinHash values that
+    are split into bands; entries sharing any whole band with the query are
+    candidates, and candidates are confirmed with their exact Jaccard
+    similarity. The band shape is chosen from the threshold so that pairs
+    near it are almost always candidates. Hashing is deterministic, so
+    results do not depend on the process or PYTHONHASHSEED.
+    """
+    
+    MASK = (1 << 64) - 1
+    # Shingles are mostly single words from a limited vocabulary, so their
+    # permuted hashes are computed once and kept (up to this many)
+    MAX_CACHED_SHINGLES = 200_000
+    
+    def __init__(self, threshold=0.7, shingle_size=1, num_perm=64, seed=1):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Similarity threshold must be in (0, 1]: {threshold}")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        rows = 1
+        while (num_perm % (rows * 2) == 0
+               and (1 / (num_perm // (rows * 2))) ** (1 / (rows * 2)) <= threshold * 0.85):
+            rows *= 2
+        self.rows = rows
+        self.bands = num_perm // rows
+        rng = random.Random(seed)
+        self._permutations = [(rng.getrandbits(64) | 1, rng.getrandbits(64))
+                              for _ in range(num_perm)]
+        self._buckets = [{} for _ in range(self.bands)]
+        self._entries = []  # (key, group, shingles)
+        self._vectors = {}  # shingle -> its num_perm permuted hashes
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _vector(self, shingle):
+        """The shingle's hash under every permutation"""
+        vector = self._vectors.get(shingle)
+        if vector is None:
+            digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+            x = int.from_bytes(digest, "little")
+            mask = self.MASK
+            vector = tuple(((a * x + b) & mask) >> 32 for a, b in self._permutations)
+            if len(self._vectors) < self.MAX_CACHED_SHINGLES:
+                self._vectors[shingle] = vector
+        return vector
+    
+    def _band_keys(self, shingles):
+        """One hashable key per band of the MinHash signature"""
+        vectors = [self._vector(shingle) for shingle in shingles]
+        if not vectors:
+            signature = [0] * self.num_perm
+        elif len(vectors) == 1:
+            signature = vectors[0]
+        else:
+            signature = list(map(min, *vectors))
+        rows = self.rows
+        return [tuple(signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+    
+    def add(self, key, test_description, group=None):
+        """Index a description under key; group limits matches (e.g. a template id)"""
+        shingles = frozenset(description_shingles(test_description, self.shingle_size))
+        entry_id = len(self._entries)
+        self._entries.append((key, group, shingles))
+        for buckets, band_key in zip(self._buckets, self._band_keys(shingles)):
+            buckets.setdefault(band_key, []).append(entry_id)
+    
+    def query(self, test_description, group=None):
+        """[(similarity, key), ...] for indexed descriptions at or above the threshold, best first"""
+        shingles = frozenset(description_shingles(test_description, self.shingle_size))
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(shingles)):
+            candidates.update(buckets.get(band_key, ()))
+        
+        matches = []
+        for entry_id in sorted(candidates):
+            key, entry_group, entry_shingles = self._entries[entry_id]
+            if entry_group != group:
+                continue
+            union = len(shingles | entry_shingles)
+            similarity = len(shingles & entry_shingles) / union if union else 1.0
+            if similarity >= self.threshold:
+                matches.append((similarity, entry_id, key))
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [(similarity, key) for similarity, _, key in matches]
+
+
+CLUSTER_REPORT = "clusters.json"
+
+
+class DescriptionGrouper:
+    """
+    Groups near-duplicate descriptions under the first one seen
+    A description joins an earlier representative when their shingle
+    similarity reaches the threshold, both select the same template and
+    they share the same negation words and action verbs, so "valid login"
+    and "invalid login", or "can upload" and "cannot upload", never merge.
+    Pass one to iter_batch or
+    ContentStore.sync to generate one test per cluster; report() lists the
+    clusters found.
+    """
+    
+    def __init__(self, threshold=0.7, shingle_size=1):
+        self.index = SimilarityIndex(threshold, shingle_size)
+        self.representatives = []  # description per representative
+        self.contrasts = []  # description_contrasts per representative
+        self.files = []  # saved name per representative, filled in by the caller
+        self.members = {}  # representative number -> [(description, similarity)]
+        self.seen = 0
+    
+    @property
+    def grouped(self):
+        return self.seen - len(self.representatives)
+    
+    def assign(self, test_description):
+        """
+        Return (representative description, similarity) when the description
+        is a near-duplicate of an earlier one, else register it and return None
+        """
+        self.seen += 1
+        template_id = select_template(test_description)
+        contrasts = description_contrasts(test_description)
+        for similarity, number in self.index.query(test_description, template_id):
+            if self.contrasts[number] == contrasts:
+                self.members.setdefault(number, []).append((test_description, similarity))
+                return self.representatives[number], similarity
+        self.index.add(len(self.representatives), test_description, template_id)
+        self.representatives.append(test_description)
+        self.contrasts.append(contrasts)
+        return None
+    
+    def unique(self, descriptions):
+        """Yield only the descriptions that start a new cluster"""
+        for description in descriptions:
+            if self.assign(description) is None:
+                yield description
+    
+    def report(self):
+        """clusters.json data: clusters with at least one member, largest first"""
+        clusters = [
+            {
+                "representative": self.representatives[number],
+                "file": self.files[number] if number < len(self.files) else None,
+                "members": [{"description": description, "similarity": round(similarity, 3)}
+                            for description, similarity in members],
+            }
+            for number, members in sorted(self.members.items(),
+                                          key=lambda item: (-len(item[1]), item[0]))
+        ]
+        return {
+            "version": 1,
+            "threshold": self.index.threshold,
+            "descriptions": self.seen,
+            "representatives": len(self.representatives),
+            "grouped": self.grouped,
+            "clusters": clusters,
+        }
+    
+    def report_text(self):
+        return json.dumps(self.report(), indent=1) + "\n"
+
+
+# ============================================================================
+# SYNTAX VALIDATION: KEEP UNPARSABLE TESTS OUT OF THE OUTPUT
+# ============================================================================
+
+# Lists the tests a validated batch rejected; written next to the tests
+REJECTION_REPORT = "rejected.json"
+
+
+class SyntaxCache:
+    """
+    Parses generated modules, remembering each verdict by content hash
+    A bounded LRU maps the SHA-1 of a module's UTF-8 source to its result,
+    so a module seen before is not parsed again. Sources are only parsed
+    to an AST: nothing is compiled to bytecode or run.
+    """
+    
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._verdicts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def check(self, code):
+        """
+        None when the source parses, else (line, message)
+        code may be a string or text or UTF-8 bytes chunks (see iter_generate)
+        """
+        if isinstance(code, (str, bytes)):
+            code = [code]
+        try:
+            data = b"".join(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+                            for chunk in code)
+        except UnicodeEncodeError as error:
+            return None, f"cannot be saved as UTF-8 ({error.reason})"
+        key = hashlib.sha1(data).digest()
+        with self._lock:
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return self._verdicts[key]
+            self.misses += 1
+        
+        try:
+            compile(data, "<generated test>", "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+            verdict = None
+        except (SyntaxError, ValueError) as error:  # ValueError: null bytes (Python < 3.12)
+            verdict = (getattr(error, "lineno", None), getattr(error, "msg", None) or str(error))
+        
+        with self._lock:
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self.maxsize:
+                self._verdicts.popitem(last=False)
+        return verdict
+
+
+# Process-wide cache; each worker process has its own
+SYNTAX_CACHE = SyntaxCache()
+
+# Stands in for the description when checking where a template puts it
+_SLOT_PROBE = "Descriptionprobe"
+
+# Text that cannot end, escape or open anything inside a string literal
+_INERT_TEXT = re.compile(r"[^\"'\\{}\x00-\x1f\x7f\ud800-\udfff]*")
+
+# (template id, options) -> (version, verdict); see _string_only_slots
+_string_only_cache = {}
+
+
+def _string_only_slots(template_id, options=DEFAULT_OPTIONS):
+    """
+    True when the template parses with these options and puts the
+    description only inside str literals, never right after a backslash
+    Any description matching _INERT_TEXT then leaves the module parsing
+    too, so it needs no parse of its own.
+    """
+    version = current_version(template_id, options)
+    cached = _string_only_cache.get((template_id, options))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    source = render_template(template_id, _SLOT_PROBE, options)[0]
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        tree = None
+    verdict = False
+    if tree is not None:
+        in_strings = sum(node.value.count(_SLOT_PROBE) for node in ast.walk(tree)
+                         if isinstance(node, ast.Constant) and isinstance(node.value, str))
+        starts = [match.start() for match in re.finditer(_SLOT_PROBE, source)]
+        escaped = any((start - len(source[:start].rstrip("\\"))) % 2 for start in starts)
+        verdict = in_strings == len(starts) and not escaped
+    _string_only_cache[(template_id, options)] = (version, verdict)
+    return verdict
+
+
+@dataclass(frozen=True)
+class SyntaxRejection:
+    """A generated test that did not parse, and why"""
+    test_number: int
+    description: str
+    template_id: str
+    line: int
+    error: str
+
+
+def check_syntax(test_number, test_description, template_id, code, options=DEFAULT_OPTIONS):
+    """
+    Parse one generated test; returns a SyntaxRejection, or None when it parses
+    A template-rendered test whose description is plain text (no quotes,
+    backslashes, braces or control characters) in a template that keeps it
+    inside string literals is accepted without a parse; anything else,
+    including all model output, is parsed (see SyntaxCache).
+    """
+    with METRICS.timed("validate"):
+        if (isinstance(_backend, TemplateBackend) and _INERT_TEXT.fullmatch(test_description)
+                and _string_only_slots(template_id, options)):
+            return None
+        verdict = SYNTAX_CACHE.check(code)
+    if verdict is None:
+        return None
+    METRICS.count("rejected")
+    return SyntaxRejection(test_number, test_description, template_id, *verdict)
+
+
+class SyntaxGate:
+    """
+    Collects the tests a batch rejected for not parsing
+    Pass one as validate= to generate_batch, iter_batch, agenerate_batch or
+    ContentStore.sync: every test is parsed before it is written (inside the
+    worker processes when there are workers), and one that does not parse
+    is skipped and listed in rejected.json instead.
+    """
+    
+    def __init__(self):
+        self.checked = 0
+        self.rejected = []
+    
+    def record(self, rejection):
+        """Count one checked test; rejection is its SyntaxRejection or None"""
+        self.checked += 1
+        if rejection is not None:
+            self.rejected.append(rejection)
+    
+    def report(self):
+        """rejected.json data: every rejected test in input order"""
+        return {
+            "version": 1,
+            "checked": self.checked,
+            "rejected": len(self.rejected),
+            "tests": [
+                {"test": rejection.test_number, "description": rejection.description,
+                 "template": rejection.template_id, "line": rejection.line,
+                 "error": rejection.error}
+                for rejection in sorted(self.rejected, key=lambda r: r.test_number)
+            ],
+        }
+    
+    def report_text(self):
+        return json.dumps(self.report(), indent=1, ensure_ascii=False) + "\n"
+
+
+# ============================================================================
+# TEST-IMPACT INDEX: WHICH GENERATED TESTS A CHANGE CAN AFFECT
+# ============================================================================
+
+IMPACT_INDEX = "test_index.json"
+
+# A locator in a browser template: By.ID, "username" and the like
+_LOCATOR = re.compile(r'By\.([A-Z_]+),\s*f?"([^"]+)"')
+
+# How each kind of locator is written in the index
+_ELEMENT_FORMS = {
+    "ID": "#{}",
+    "CLASS_NAME": ".{}",
+    "NAME": "[name={}]",
+}
+
+
+def template_targets(template_id):
+    """
+    The routes and page elements a template's test touches
+    Read from its browser template: routes from the {url:...} slots,
+    elements from the By locators outside comments (#id, .class, [name=...],
+    or the CSS selector / XPath as written), plus any "routes" and "elements"
+    its templates.json entry lists, for targets built at run time. The fast
+    and page-object variants check the same pages and elements.
+    """
+    template = REGISTRY.get(template_id)
+    declared_routes, declared_elements = REGISTRY.declared_targets(template_id)
+    routes = sorted({argument for _, name, argument in template.slot_positions
+                     if name == "url"} | set(declared_routes))
+    source = "\n".join(line for line in "".join(
+        "" if part is None else part for part in template.parts
+    ).split("\n") if not line.lstrip().startswith("#"))
+    elements = []
+    found = [_ELEMENT_FORMS.get(kind, "{}").format(value)
+             for kind, value in _LOCATOR.findall(source)]
+    for element in found + declared_elements:
+        if element not in elements:
+            elements.append(element)
+    return {"routes": routes, "elements": elements}
+
+
+class ImpactIndex:
+    """
+    Records which template each generated test comes from, for test_index.json
+    Routes and elements are stored once per template (see template_targets),
+    and tests by the name pytest collects them under: the file name, or
+    "module.py::Class" for a test packed into a module. Code from a model
+    backend ("model:<name>") has no template to read targets from; it is
+    marked unindexed, and affected_tests always selects it.
+    """
+    
+    def __init__(self):
+        self.tests = {}  # test key -> template id, in output order
+    
+    def add(self, name, template_id):
+        self.tests[_collection_key(name)] = template_id
+    
+    def report(self):
+        known = set(REGISTRY.template_ids())
+        return {
+            "version": 1,
+            "templates": {
+                template_id: template_targets(template_id) if template_id in known
+                else {"routes": [], "elements": [], "unindexed": True}
+                for template_id in sorted(set(self.tests.values()))
+            },
+            "tests": self.tests,
+        }
+    
+    def report_text(self):
+        return json.dumps(self.report(), indent=1) + "\n"
+
+
+def load_impact_index(path):
+    """Read test_index.json, given the file or the output directory holding it"""
+    path = Path(path)
+    if path.is_dir():
+        path = path / IMPACT_INDEX
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _element_names(element):
+    """Ways to name an element in a change list: as indexed, bare, or a quoted XPath value"""
+    names = {element}
+    if element[:1] in "#.":
+        names.add(element[1:])
+    elif element.startswith("[name="):
+        names.add(element[6:-1])
+    names.update(re.findall(r"'([^'{}]+)'", element))
+    return names
+
+
+def _route_affected(route, change):
+    """A route is affected by a change to itself or to a route above it"""
+    prefix = change.rstrip("/")
+    return route == change or (bool(prefix) and route.startswith(prefix + "/"))
+
+
+def affected_tests(index, changes):
+    """
+    Tests in an index that a change to any of `changes` can affect
+    A change is a route ("/login", which also covers routes below it), a
+    page element ("#username", ".cart-count", "username", or a value quoted in
+    an XPath such as "add-to-cart") or a template id. Templates are matched
+    once, then tests are picked by template. Tests of an unindexed template
+    (model output) could touch anything, so they are always selected.
+    Returns test keys in index order.
+    """
+    changes = [change.strip() for change in changes if change.strip()]
+    hit = set()
+    for template_id, targets in index["templates"].items():
+        if targets.get("unindexed"):
+            hit.add(template_id)
+            continue
+        names = set()
+        for element in targets["elements"]:
+            names |= _element_names(element)
+        for change in changes:
+            if (change == template_id or change in names
+                    or any(_route_affected(route, change) for route in targets["routes"])):
+                hit.add(template_id)
+                break
+    return [key for key, template_id in index["tests"].items() if template_id in hit]
+
+
+# ============================================================================
+# MODEL BACKENDS: WHERE THE GENERATED CODE COMES FROM
+# ============================================================================
+
+class BackendError(Exception):
+    """A model backend could not produce a test"""
+
+
+class TemplateBackend:
+    """
+    The built-in backend: keyword matching plus templates, no model involved
+    This is the default. It uses the render cache, and only this backend
+    sleeps for the simulated "AI thinking" latency.
+    """
+    
+    name = "template"
+    
+    def generate(self, test_description, options=DEFAULT_OPTIONS):
+        """Returns (template id, code)"""
+        return _render_test(test_description, options)
+    
+    def generate_many(self, descriptions, options=DEFAULT_OPTIONS):
+        """Returns [(template id, code), ...] in input order"""
+        return [self.generate(description, options) for description in descriptions]
+    
+    def settings(self):
+        """Keyword arguments that recreate this backend (e.g. in a worker process)"""
+        return {}
+    
+    def stats(self):
+        return {"backend": self.name}
+    
+    def close(self):
+        pass
+
+
+# What the model is asked for; the fake model server reads the scenario
+# and options back out of these lines
+MODEL_PROMPT = """You write automated UI tests in Python with pytest.
+Write one complete, runnable test module for the scenario below and reply with the code only.
+
+Scenario: {description}
+Test style: {style}
+Generation options: {options}
+"""
+
+TIER_STYLES = {
+    "browser": "Selenium WebDriver against a real browser",
+    "fast": "plain HTTP requests and HTML parsing with FastClient (from fast_client import FastClient), no browser",
+}
+
+_CODE_FENCE = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)```", re.DOTALL)
+
+
+def build_prompt(test_description, options=DEFAULT_OPTIONS):
+    """The completion prompt sent to a model backend for one description"""
+    return MODEL_PROMPT.format(description=test_description,
+                               style=TIER_STYLES[options.tier], options=options.key())
+
+
+def extract_code(text):
+    """The code in a model reply: the first fenced block, or the whole reply"""
+    match = _CODE_FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def _percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections to one server, reused most-recent first"""
+    
+    def __init__(self, url, size, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid model URL: {url}")
+        self.connection_class = (http.client.HTTPSConnection if parts.scheme == "https"
+                                 else http.client.HTTPConnection)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Returns (connection, reused)"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.opened += 1
+        return self.connection_class(self.host, self.port, timeout=self.timeout), False
+    
+    def release(self, connection, reusable):
+        if reusable:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(connection)
+                    return
+        connection.close()
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class HTTPModelBackend:
+    """
+    Generates tests with a model behind an OpenAI-compatible completions API
+    Descriptions are sent `batch_size` prompts per request, with at most
+    `concurrency` requests in flight over pooled keep-alive connections.
+    Single generate() calls made at the same time (async batches, the
+    service) are coalesced into shared requests for up to batch_wait
+    seconds. Connection errors, 429 and 5xx are retried with jittered
+    exponential backoff, honouring Retry-After. Each call's latency and
+    token usage go into METRICS; stats() adds latency percentiles.
+    """
+    
+    name = "http"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, url="http://localhost:8000/v1/completions", model="test-generator",
+                 api_key=None, concurrency=8, batch_size=8, batch_wait=0.005,
+                 retries=3, backoff=0.5, timeout=60, max_tokens=2048, temperature=0):
+        if concurrency < 1 or batch_size < 1:
+            raise ValueError("Model concurrency and batch size must be at least 1")
+        self.url = url
+        self.model = model
+        self.api_key = api_key if api_key is not None else os.environ.get("MODEL_API_KEY")
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.template_id = f"model:{model}"
+        
+        self._pool = _ConnectionPool(url, concurrency, timeout)
+        self._headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            self._headers["Authorization"] = f"Bearer {self.api_key}"
+        self._executor = ThreadPoolExecutor(max_workers=concurrency,
+                                            thread_name_prefix="model-backend")
+        self._waiting = deque()  # (description, options, future) for coalescing
+        self._wakeup = threading.Condition()
+        self._dispatcher = None
+        self._closed = False
+        
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=100_000)  # most recent calls, for percentiles
+        self.calls = 0
+        self.retried = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+    
+    def settings(self):
+        return {
+            "url": self.url, "model": self.model, "api_key": self.api_key,
+            "concurrency": self.concurrency, "batch_size": self.batch_size,
+            "batch_wait": self.batch_wait, "retries": self.retries,
+            "backoff": self.backoff, "timeout": self.timeout,
+            "max_tokens": self.max_tokens, "temperature": self.temperature,
+        }
+    
+    def generate(self, test_description, options=DEFAULT_OPTIONS):
+        """Returns (template id, code); concurrent calls may share one request"""
+        if self.batch_size == 1 or self.batch_wait <= 0:
+            return self._complete([(test_description, options)])[0]
+        return self.submit(test_description, options).result()
+    
+    def submit(self, test_description, options=DEFAULT_OPTIONS):
+        """
+        Queue one description for the next coalesced request
+        Returns a concurrent.futures.Future of (template id, code), so
+        asyncio callers can await it without tying up a thread each.
+        """
+        future = Future()
+        with self._wakeup:
+            if self._closed:
+                raise BackendError("Backend is closed")
+            self._waiting.append((test_description, options, future))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_waiting,
+                                                    name="model-batcher", daemon=True)
+                self._dispatcher.start()
+            self._wakeup.notify()
+        return future
+    
+    def iter_generate(self, descriptions, options=DEFAULT_OPTIONS):
+        """
+        Yields (description, template id, code) in input order
+        Only a bounded window of batches is in flight, so any number of
+        descriptions can stream through.
+        """
+        in_flight = deque()
+        try:
+            for _, batch in _chunked(descriptions, 0, self.batch_size):
+                requests = [(description, options) for description in batch]
+                in_flight.append((batch, self._executor.submit(self._complete, requests)))
+                if len(in_flight) >= self.concurrency * 2:
+                    batch, future = in_flight.popleft()
+                    for description, (template_id, code) in zip(batch, future.result()):
+                        yield description, template_id, code
+            while in_flight:
+                batch, future = in_flight.popleft()
+                for description, (template_id, code) in zip(batch, future.result()):
+                    yield description, template_id, code
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+    
+    def generate_many(self, descriptions, options=DEFAULT_OPTIONS):
+        """Returns [(template id, code), ...] in input order"""
+        return [(template_id, code)
+                for _, template_id, code in self.iter_generate(descriptions, options)]
+    
+    def stats(self):
+        """Call counters, token totals and latency percentiles (seconds)"""
+        with self._stats_lock:
+            ordered = sorted(self._latencies)
+            return {
+                "backend": self.name,
+                "model": self.model,
+                "calls": self.calls,
+                "retries": self.retried,
+                "failures": self.failures,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "connections_opened": self._pool.opened,
+                "latency_p50": _percentile(ordered, 0.50),
+                "latency_p95": _percentile(ordered, 0.95),
+                "latency_p99": _percentile(ordered, 0.99),
+                "latency_max": ordered[-1] if ordered else 0.0,
+            }
+    
+    def close(self):
+        """Finish queued calls, then stop the threads and close idle connections"""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+    
+    def _dispatch_waiting(self):
+        """Group waiting generate() calls into requests of up to batch_size"""
+        while True:
+            with self._wakeup:
+                while not self._waiting and not self._closed:
+                    self._wakeup.wait()
+                if self._closed and not self._waiting:
+                    return
+                deadline = time.monotonic() + self.batch_wait
+                while len(self._waiting) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                items = [self._waiting.popleft()
+                         for _ in range(min(self.batch_size, len(self._waiting)))]
+            self._executor.submit(self._complete_waiting, items)
+    
+    def _complete_waiting(self, items):
+        try:
+            results = self._complete([(description, options) for description, options, _ in items])
+        except BaseException as error:
+            for _, _, future in items:
+                future.set_exception(error)
+        else:
+            for (_, _, future), result in zip(items, results):
+                future.set_result(result)
+    
+    def _complete(self, requests):
+        """One completions request for [(description, options), ...]"""
+        payload = {
+            "model": self.model,
+            "prompt": [build_prompt(description, options) for description, options in requests],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+        }
+        reply = self._post(json.dumps(payload).encode("utf-8"))
+        try:
+            choices = sorted(reply["choices"], key=lambda choice: choice.get("index", 0))
+            texts = [choice["text"] for choice in choices]
+        except (KeyError, TypeError) as error:
+            raise BackendError(f"Malformed model reply: missing {error}") from None
+        if len(texts) != len(requests):
+            raise BackendError(f"Model returned {len(texts)} completion(s) "
+                               f"for {len(requests)} prompt(s)")
+        
+        usage = reply.get("usage") or {}
+        with self._stats_lock:
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+        METRICS.count("model_prompt_tokens", usage.get("prompt_tokens", 0))
+        METRICS.count("model_completion_tokens", usage.get("completion_tokens", 0))
+        for _ in texts:
+            METRICS.count_template(self.template_id)
+        return [(self.template_id, extract_code(text)) for text in texts]
+    
+    def _post(self, body):
+        """POST with retries; returns the decoded JSON reply"""
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                status, headers, data = self._send(body)
+            except (OSError, http.client.HTTPException) as error:
+                failure = f"{type(error).__name__}: {error}"
+            else:
+                elapsed = time.perf_counter() - started
+                METRICS.record("model", elapsed)
+                with self._stats_lock:
+                    self.calls += 1
+                    self._latencies.append(elapsed)
+                if status == 200:
+                    try:
+                        return json.loads(data)
+                    except ValueError:
+                        raise BackendError("Model reply is not valid JSON") from None
+                failure = f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}"
+                if status not in self.RETRY_STATUSES:
+                    break
+                try:
+                    retry_after = float(headers.get("Retry-After", ""))
+                except ValueError:
+                    pass
+            
+            if attempt < self.retries:
+                with self._stats_lock:
+                    self.retried += 1
+                METRICS.count("model_retries")
+                delay = max(retry_after or 0.0, self.backoff * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        
+        with self._stats_lock:
+            self.failures += 1
+        raise BackendError(f"Model request failed after {attempt + 1} attempt(s): {failure}")
+    
+    def _send(self, body):
+        """
+        One request/response on a pooled connection
+        A reused connection the server already closed is retried once on a
+        fresh one, without counting as a failed attempt.
+        """
+        while True:
+            connection, reused = self._pool.acquire()
+            reusable = False
+            try:
+                connection.request("POST", self._pool.path, body=body, headers=self._headers)
+                response = connection.getresponse()
+                data = response.read()
+                reusable = not response.will_close
+                return response.status, response.headers, data
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+            finally:
+                self._pool.release(connection, reusable)
+
+
+BACKENDS = {"template": TemplateBackend, "http": HTTPModelBackend}
+
+# Process-wide backend used by every generation path
+_backend = TemplateBackend()
+
+
+def configure_backend(name="template", **settings):
+    """
+    Switch this process to a backend from BACKENDS, closing the previous one
+    Returns the new backend
+    """
+    global _backend
+    backend = BACKENDS[name](**settings)
+    _backend.close()
+    _backend = backend
+    return backend
+
+
+def _backend_config():
+    """Arguments that recreate the current backend in a worker process"""
+    return (_backend.name, _backend.settings())
+
+
+def _init_worker(cache_config, backend_config):
+    """Process pool initializer: same render cache and backend as the parent"""
+    configure_render_cache(*cache_config)
+    name, settings = backend_config
+    configure_backend(name, **settings)
+
+
+# ============================================================================
+# SAVE GENERATED CODE TO FILE
+# ============================================================================
+
+def save_test_file(code, test_number, output_dir=None, verbose=True, timestamp=True):
+    """
+    Saves generated test code to a Python file
+    code may be a string or the chunks yielded by iter_generate (text or
+    encoded; encoded chunks go to the file without another copy).
+    With timestamp=False the name depends only on the test number,
+    so repeated runs produce identical file names
+
+    The file is written to a temporary name and then moved into place, so a
+    half-written test is never visible. A timestamped name that is already
+    taken (same test number in the same second) gets a _2, _3, ... suffix
+    instead of being overwritten.
+    """
+    if timestamp:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stem = f"generated_test_{test_number}_{stamp}"
+    else:
+        stem = f"generated_test_{test_number}"
+    directory = Path(output_dir) if output_dir is not None else Path(".")
+    
+    with METRICS.timed("write"):
+        temp_path = _write_temp_text(directory, [code] if isinstance(code, str) else code)
+        if timestamp:
+            path = _link_unique(temp_path, directory, stem, ".py")
+        else:
+            path = directory / f"{stem}.py"
+            os.replace(temp_path, path)
+    
+    filename = str(path) if output_dir is not None else path.name
+    if verbose:
+        print(f"💾 Saved to: {filename}")
+    return filename
+
+
+# tempfile.mkstemp would create private (0600) files; temp files are opened
+# with mode 0o666 instead, so the OS applies the process umask and generated
+# output gets the usual permissions without the umask being read (and reset)
+_TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def _mkstemp(directory):
+    """Create a hidden temp file in directory with regular file permissions"""
+    for _ in range(100):
+        temp_name = os.path.join(directory, f".{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(temp_name, _TEMP_FLAGS, 0o666), temp_name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No usable temporary file name found in {directory}")
+
+
+def _write_temp_file(directory, data):
+    """Write bytes to a hidden temporary file in directory and return its path"""
+    fd, temp_name = _mkstemp(directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name)
+
+
+def _write_temp_text(directory, chunks):
+    """
+    Stream text chunks into a hidden temporary file in directory and return its path
+    UTF-8 bytes chunks skip the text layer and buffering: they go to the file
+    in one gathering write where the platform has os.writev
+    """
+    fd, temp_name = _mkstemp(directory)
+    try:
+        if chunks and isinstance(chunks[0], bytes) and hasattr(os, "writev"):
+            try:
+                _writev_all(fd, chunks)
+            finally:
+                os.close(fd)
+        elif chunks and isinstance(chunks[0], bytes):
+            with open(fd, "wb") as f:
+                write_chunks(f, chunks)
+        else:
+            with open(fd, "w", encoding="utf-8", newline="") as f:
+                write_chunks(f, chunks)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name)
+
+
+# Most buffers one os.writev call may take (IOV_MAX is 1024 on Linux and macOS)
+_WRITEV_MAX_BUFFERS = 1024
+
+
+def _writev_all(fd, chunks):
+    """Write every bytes chunk to fd with os.writev, resuming after short writes"""
+    pending = list(chunks)
+    start = 0
+    while start < len(pending):
+        written = os.writev(fd, pending[start:start + _WRITEV_MAX_BUFFERS])
+        while start < len(pending) and written >= len(pending[start]):
+            written -= len(pending[start])
+            start += 1
+        if written:
+            pending[start] = memoryview(pending[start])[written:]
+
+
+def _link_unique(temp_path, directory, stem, suffix):
+    """
+    Atomically give a finished temp file the first free name
+    stem.suffix, stem_2.suffix, ... (a hard link never replaces an existing file)
+    On filesystems without hard links (FAT, many SMB mounts) the name is
+    reserved with an exclusive create and the temp file is moved onto it.
+    """
+    attempt = 1
+    hard_links = True
+    try:
+        while True:
+            name = f"{stem}{suffix}" if attempt == 1 else f"{stem}_{attempt}{suffix}"
+            path = directory / name
+            try:
+                if hard_links:
+                    os.link(temp_path, path)
+                else:
+                    os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+                    os.replace(temp_path, path)
+                return path
+            except FileExistsError:
+                attempt += 1
+            except OSError:
+                if not hard_links:
+                    raise
+                hard_links = False
+    finally:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass  # moved into place
+
+
+# ============================================================================
+# BULK OUTPUT SINKS: ARCHIVES AND PACKED MODULES
+# ============================================================================
+
+class ArchiveSink:
     """
-    Simulates AI generation using intelligent templates
-    This demonstrates the concept without requiring OpenAI API
+    Buffers generated tests into a single zip or tar archive
+    The archive is built under a temporary name and renamed into place on
+    close(), so readers only ever see a complete archive. Member names come
+    from the test number and timestamps are fixed, so the same input always
+    produces a byte-identical archive.
     """
     
-    print("\n" + "="*70)
-    print("🤖 AI is generating your test code...")
-    print("="*70)
-    print(f"📝 Description: {test_description}")
-    print("⏳ Processing with AI model...\n")
+    def __init__(self, path, fmt="zip"):
+        if fmt not in ("zip", "tar"):
+            raise ValueError(f"Unsupported archive format: {fmt}")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = _mkstemp(self.path.parent)
+        os.close(fd)
+        self._temp_path = Path(temp_name)
+        if fmt == "zip":
+            self._archive = zipfile.ZipFile(
+                self._temp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+            )
+        else:
+            # Empty name and fixed mtime in the gzip header keep the archive
+            # byte-identical across runs
+            self._raw = open(self._temp_path, "wb")
+            self._gzip = gzip.GzipFile(
+                filename="", mode="wb", compresslevel=1, fileobj=self._raw, mtime=0
+            )
+            self._archive = tarfile.open(fileobj=self._gzip, mode="w")
+    
+    def add(self, test_number, code):
+        """Add one test; returns its "archive:member" name"""
+        member = f"generated_test_{test_number}.py"
+        data = code.encode("utf-8")
+        with METRICS.timed("write"):
+            if self.fmt == "zip":
+                info = zipfile.ZipInfo(member, date_time=(1980, 1, 1, 0, 0, 0))
+                self._archive.writestr(
+                    info, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1
+                )
+            else:
+                info = tarfile.TarInfo(member)
+                info.size = len(data)
+                info.mtime = 0
+                self._archive.addfile(info, io.BytesIO(data))
+        return f"{self.path}:{member}"
+    
+    def add_file(self, name, text):
+        """Add a support file (e.g. conftest.py) to the archive"""
+        data = text.encode("utf-8")
+        if self.fmt == "zip":
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            self._archive.writestr(
+                info, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1
+            )
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0
+            self._archive.addfile(info, io.BytesIO(data))
     
-    # Simulate AI thinking time
-    time.sleep(2)
+    def close(self):
+        """Finish the archive and move it into place"""
+        with METRICS.timed("write"):
+            self._close_archive()
+            os.replace(self._temp_path, self.path)
     
-    # Template selection based on keywords
-    description_lower = test_description.lower()
+    def abort(self):
+        """Discard everything written so far"""
+        self._close_archive()
+        self._temp_path.unlink(missing_ok=True)
     
-    # Login test template
-    if "login" in description_lower and "invalid" in description_lower:
-        code_template = '''"""
-AI-Generated Test: Invalid Login Validation
-Generated from: "{description}"
-"""
-
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+    def _close_archive(self):
+        self._archive.close()
+        if self.fmt == "tar":
+            self._gzip.close()
+            self._raw.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
 
 
-class TestInvalidLogin:
-    """Test suite for login validation with invalid credentials"""
+class PackedModuleSink:
+    """
+    Packs many generated tests into a few Python modules
+    Each module holds up to tests_per_module test classes (renamed with the
+    test number so they cannot clash) behind one shared import block, and is
+    written atomically once full.
+    """
     
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+    def __init__(self, output_dir, tests_per_module=500):
+        self.output_dir = Path(output_dir)
+        self.tests_per_module = tests_per_module
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._pending = []
+        self._module_number = 0
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    def _module_name(self, module_number):
+        return f"generated_tests_{module_number:04d}.py"
     
-    def test_login_with_invalid_credentials(self):
-        """
-        Test Case: Verify error message appears when logging in 
-        with invalid username and password
-        """
-        # Navigate to login page
-        self.driver.get("http://localhost:8080/login")
-        
-        # Locate and fill username field
-        username_field = self.driver.find_element(By.ID, "username")
-        username_field.clear()
-        username_field.send_keys("invalid_user@example.com")
-        
-        # Locate and fill password field
-        password_field = self.driver.find_element(By.ID, "password")
-        password_field.clear()
-        password_field.send_keys("wrongPassword123")
-        
-        # Click login button
-        login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
-        login_button.click()
-        
-        # Wait for error message to appear
-        error_message = WebDriverWait(self.driver, 10).until(
-            EC.visibility_of_element_located((By.CLASS_NAME, "error-message"))
-        )
+    def add(self, test_number, code):
+        """Add one test; returns its "module::Class" name"""
+        self._pending.append((test_number, code))
+        class_name = _first_class_name(code)
+        name = f"{self._module_name(self._module_number + 1)}::{class_name}_{test_number}"
+        if len(self._pending) >= self.tests_per_module:
+            self._flush()
+        return name
+    
+    def add_file(self, name, text):
+        """Write a support file (e.g. conftest.py) next to the packed modules"""
+        _write_text_atomic(self.output_dir / name, text)
+    
+    def _flush(self):
+        if not self._pending:
+            return
+        self._module_number += 1
+        source = pack_test_module(self._pending)
+        self._pending = []
+        with METRICS.timed("write"):
+            temp_path = _write_temp_file(self.output_dir, source.encode("utf-8"))
+            os.replace(temp_path, self.output_dir / self._module_name(self._module_number))
+    
+    def close(self):
+        self._flush()
+    
+    def abort(self):
+        self._pending = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+_CLASS_LINE = re.compile(r"^class (\w+)", re.MULTILINE)
+
+
+def _first_class_name(code):
+    match = _CLASS_LINE.search(code)
+    return match.group(1) if match else "Test"
+
+
+def pack_test_module(tests):
+    """
+    Merge generated test modules into one module source
+    tests is a list of (test_number, code). The module docstrings become
+    comments, imports are de-duplicated into one header, each test class is
+    suffixed with its test number and the per-file __main__ blocks are dropped.
+    """
+    imports = []
+    bodies = []
+    for test_number, code in tests:
+        lines = code.split("\n")
         
-        # Verify error message is displayed
-        assert error_message.is_displayed(), "Error message should be visible"
+        # Module docstring -> comment block
+        comment = []
+        index = 0
+        if lines and lines[0].startswith('"""'):
+            index = 1
+            while index < len(lines) and not lines[index].startswith('"""'):
+                if lines[index].strip():
+                    comment.append(f"# {lines[index]}")
+                index += 1
+            index += 1
         
-        # Verify error message contains expected text
-        assert "Invalid credentials" in error_message.text.lower() or \\
-               "incorrect username or password" in error_message.text.lower(), \\
-               f"Unexpected error message: {error_message.text}"
+        body = []
+        for line in lines[index:]:
+            if line.startswith('if __name__ == "__main__":'):
+                break
+            if line.startswith(("import ", "from ")):
+                if line not in imports:
+                    imports.append(line)
+                continue
+            body.append(line)
         
-        print("✓ Test Passed: Error message displayed correctly for invalid login")
-
+        body_text = "\n".join(body).strip("\n")
+        body_text = _CLASS_LINE.sub(lambda m: f"class {m.group(1)}_{test_number}", body_text)
+        bodies.append("\n".join([f"# --- Test {test_number} ---"] + comment + [body_text]))
+    
+    first, last = tests[0][0], tests[-1][0]
+    header = f'''"""
+AI-Generated Tests: packed module for tests {first}-{last}
+"""
 
-if __name__ == "__main__":
+''' + "\n".join(imports)
+    footer = '''if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 '''
+    return "\n\n\n".join([header] + bodies + [footer])
 
-        code = code_template.replace("{description}", test_description)
-    
-    # Empty form validation template
-    elif "empty" in description_lower and "form" in description_lower:
-        code_template = '''"""
-AI-Generated Test: Empty Form Validation
-Generated from: "{description}"
-"""
 
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Stands in for the description while a template is rendered for
+# parametrize_test_module; it cannot occur in a template
+_DESCRIPTION_MARKER = "\x00"
+
+_TEST_METHOD = re.compile(r"^(    )def (test_\w+)\(self\):", re.MULTILINE)
+
 
+def parametrize_test_module(template_id, descriptions, options=DEFAULT_OPTIONS):
+    """
+    One module that runs a template's test once per description
+    The template is rendered once and its test method is parametrized over
+    DESCRIPTIONS, so pytest uses each description as its test ID. The
+    descriptions are written as string literals, so quotes and braces in
+    them cannot break the module.
+    """
+    code, _ = render_template(template_id, _DESCRIPTION_MARKER, options)
+    code = code.replace(f'Generated from: "{_DESCRIPTION_MARKER}"',
+                        f"Generated from {len(descriptions)} description(s), one test case each")
+    code = code.replace(_DESCRIPTION_MARKER, "{description}")
+    code = _TEST_METHOD.sub(
+        r'\1@pytest.mark.parametrize("description", DESCRIPTIONS)\n\1def \2(self, description):',
+        code, count=1,
+    )
+    literals = "".join(f"    {json.dumps(text, ensure_ascii=False)},\n" for text in descriptions)
+    head, separator, tail = code.partition("\n\n\nclass ")
+    return (f"{head}\n\n\n# One test case per description; the description is the test ID\n"
+            f"DESCRIPTIONS = [\n{literals}]{separator}{tail}")
+
+
+# ============================================================================
+# CONTENT-ADDRESSED STORE: INCREMENTAL REGENERATION
+# ============================================================================
 
-class TestEmptyFormValidation:
-    """Test suite for form validation with empty fields"""
+class ContentStore:
+    """
+    Output directory where each test is stored under its content hash
+    A manifest maps every description to the hash, template and template
+    version it was generated with. sync() skips descriptions whose template
+    and keyword rules have not changed, writes only new content and prunes
+    files no description refers to any more.
+    """
     
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+    MANIFEST = "manifest.json"
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.entries = {}
+        self.support = []
+        self._load_manifest()
     
-    def test_submit_empty_registration_form(self):
+    def _load_manifest(self):
+        try:
+            with open(self.root / self.MANIFEST, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        self.entries = manifest["entries"]
+        self.support = manifest.get("support", [])
+    
+    def _save_manifest(self):
+        manifest = {"version": 1, "entries": self.entries, "support": self.support}
+        _write_text_atomic(self.root / self.MANIFEST,
+                           json.dumps(manifest, indent=1, sort_keys=True) + "\n")
+    
+    @staticmethod
+    def filename_for(content_hash):
+        return f"generated_test_{content_hash[:16]}.py"
+    
+    def _is_current(self, entry, rules_version, options):
+        """True when an entry would render to the same file today"""
+        if "duplicate_of" in entry:
+            return False  # regrouped on every sync
+        if entry.get("rules_version") != rules_version:
+            return False
+        if entry.get("options") != options.key():
+            return False
+        if current_version(entry["template"], options) != entry["template_version"]:
+            return False
+        return (self.root / entry["file"]).exists()
+    
+    def sync(self, descriptions, options=DEFAULT_OPTIONS, durations=None, dedupe=None,
+             validate=None, index=None):
         """
-        Test Case: Verify validation errors appear when submitting
-        an empty registration form
+        Bring the store in line with descriptions
+        Returns counts: unchanged, written, reused (content already stored),
+        grouped (near-duplicates pointed at another description's file, with
+        a DescriptionGrouper as dedupe), rejected (regenerated tests that did
+        not parse, with a SyntaxGate as validate) and pruned files. An
+        ImpactIndex as index is filled from every live entry.
         """
-        # Navigate to registration page
-        self.driver.get("http://localhost:8080/register")
+        rules_version = REGISTRY.current_rules_version()
+        support = [Path(path).name for path in write_support_files(self.root, options)]
+        stats = {"unchanged": 0, "written": 0, "reused": 0, "grouped": 0, "rejected": 0,
+                 "pruned": 0}
+        entries = {}
         
-        # Click submit without filling any fields
-        submit_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
-        submit_button.click()
+        for position, description in enumerate(descriptions, 1):
+            if description in entries:
+                continue
+            
+            if dedupe is not None:
+                match = dedupe.assign(description)
+                if match is not None and match[0] not in entries:
+                    stats["grouped"] += 1  # its representative was rejected
+                    continue
+                if match is not None:
+                    representative, similarity = match
+                    entry = dict(entries[representative], duplicate_of=representative)
+                    entry["similarity"] = round(similarity, 3)
+                    entries[description] = entry
+                    stats["grouped"] += 1
+                    continue
+            
+            old = self.entries.get(description)
+            if old is not None and self._is_current(old, rules_version, options):
+                entries[description] = old
+                stats["unchanged"] += 1
+                if dedupe is not None:
+                    dedupe.files.append(old["file"])
+                continue
+            
+            template_id, version, code = _select_and_render(description, options)
+            if validate is not None:
+                rejection = check_syntax(position, description, template_id, code, options)
+                validate.record(rejection)
+                if rejection is not None:
+                    stats["rejected"] += 1
+                    if dedupe is not None:
+                        dedupe.files.append(None)
+                    continue
+            data = code.encode("utf-8")
+            content_hash = hashlib.sha256(data).hexdigest()
+            filename = self.filename_for(content_hash)
+            
+            path = self.root / filename
+            if path.exists():
+                stats["reused"] += 1
+            else:
+                with METRICS.timed("write"):
+                    os.replace(_write_temp_file(self.root, data), path)
+                stats["written"] += 1
+            
+            entries[description] = {
+                "hash": content_hash,
+                "file": filename,
+                "template": template_id,
+                "template_version": version,
+                "rules_version": rules_version,
+                "options": options.key(),
+            }
+            if dedupe is not None:
+                dedupe.files.append(filename)
         
-        # Wait for validation errors to appear
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "validation-error"))
-        )
+        live_files = {entry["file"] for entry in entries.values()}
+        for entry in self.entries.values():
+            path = self.root / entry["file"]
+            if entry["file"] not in live_files and path.exists():
+                path.unlink()
+                live_files.add(entry["file"])  # count each stale file once
+                stats["pruned"] += 1
         
-        # Check for required field errors
-        required_fields = ["username", "email", "password", "confirm-password"]
+        if options.shards:
+            tests = [(entry["file"], entry["template"]) for entry in entries.values()
+                     if "duplicate_of" not in entry]
+            _write_text_atomic(self.root / SHARD_PLAN,
+                               shard_plan_text(tests, options.shards, durations))
+            support.append(SHARD_PLAN)
+        if dedupe is not None:
+            _write_text_atomic(self.root / CLUSTER_REPORT, dedupe.report_text())
+            support.append(CLUSTER_REPORT)
+        if validate is not None:
+            _write_text_atomic(self.root / REJECTION_REPORT, validate.report_text())
+            support.append(REJECTION_REPORT)
+        if index is not None:
+            for entry in entries.values():
+                if "duplicate_of" not in entry:
+                    index.add(entry["file"], entry["template"])
+            _write_text_atomic(self.root / IMPACT_INDEX, index.report_text())
+            support.append(IMPACT_INDEX)
         
-        for field in required_fields:
-            error_element = self.driver.find_element(
-                By.XPATH, 
-                f"//input[@name='{field}']/following-sibling::span[@class='validation-error']"
-            )
-            
-            assert error_element.is_displayed(), \\
-                f"Validation error for {field} should be visible"
-            
-            assert "required" in error_element.text.lower() or \\
-                   "cannot be empty" in error_element.text.lower(), \\
-                   f"Unexpected validation message for {field}: {error_element.text}"
+        for name in self.support:
+            if name not in support:
+                (self.root / name).unlink(missing_ok=True)
         
-        print(f"✓ Test Passed: All {len(required_fields)} required field validations working")
+        self.entries = entries
+        self.support = support
+        self._save_manifest()
+        return stats
 
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-'''
+# ============================================================================
+# BATCH MODE: GENERATE TESTS FROM A DESCRIPTIONS FILE
+# ============================================================================
 
-        code = code_template.replace("{description}", test_description)
-    
-    # Search validation template
-    elif "search" in description_lower and "empty" in description_lower:
-        code_template = '''"""
-AI-Generated Test: Empty Search Validation
-Generated from: "{description}"
-"""
+def _detect_format(path):
+    """Guess the descriptions file format from its extension"""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    return "text"
 
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+def _iter_jsonl(lines):
+    """Yield descriptions from JSON lines (strings or {"description": ...} objects)"""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, dict):
+            if "description" not in record:
+                raise ValueError(f"Line {line_number}: missing 'description' field")
+            record = record["description"]
+        yield str(record)
 
-class TestSearchValidation:
-    """Test suite for search functionality validation"""
-    
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+
+def _iter_csv(lines):
+    """Yield descriptions from CSV rows (a 'description' column, else the first column)"""
+    rows = csv.reader(lines)
+    column = 0
+    for row_number, row in enumerate(rows):
+        if not row:
+            continue
+        if row_number == 0:
+            header = [cell.strip().lower() for cell in row]
+            if "description" in header:
+                column = header.index("description")
+                continue
+        if column < len(row):
+            yield row[column]
+
+
+def read_descriptions(source, fmt="auto"):
+    """
+    Yields test descriptions from a JSONL, CSV or plain-text file
+    Use "-" as the source to read from stdin
+    """
+    if fmt == "auto":
+        fmt = "text" if source == "-" else _detect_format(source)
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    if source == "-":
+        handle = sys.stdin
+    else:
+        handle = open(source, "r", encoding="utf-8", newline="")
     
-    def test_search_with_empty_term(self):
-        """
-        Test Case: Verify warning appears when clicking search 
-        without entering a search term
-        """
-        # Navigate to search page
-        self.driver.get("http://localhost:8080/search")
-        
-        # Leave search field empty and click search button
-        search_button = self.driver.find_element(By.ID, "search-button")
-        search_button.click()
-        
-        # Wait for warning message
-        warning_message = WebDriverWait(self.driver, 10).until(
-            EC.visibility_of_element_located((By.CLASS_NAME, "warning-message"))
-        )
-        
-        # Verify warning is displayed
-        assert warning_message.is_displayed(), "Warning message should be visible"
-        
-        # Verify warning text
-        expected_warnings = [
-            "please enter a search term",
-            "search field cannot be empty",
-            "enter at least one character"
-        ]
-        
-        warning_text = warning_message.text.lower()
-        assert any(exp in warning_text for exp in expected_warnings), \\
-               f"Unexpected warning message: {warning_message.text}"
+    try:
+        if fmt == "jsonl":
+            descriptions = _iter_jsonl(handle)
+        elif fmt == "csv":
+            descriptions = _iter_csv(handle)
+        else:
+            descriptions = (line for line in handle)
         
-        print("✓ Test Passed: Warning displayed for empty search")
+        for description in descriptions:
+            description = description.strip()
+            if description:
+                yield description
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
 
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-'''
+def _chunked(descriptions, start, chunk_size):
+    """Yield (first test number, list of descriptions) work units"""
+    descriptions = iter(descriptions)
+    first_number = start
+    while True:
+        chunk = list(islice(descriptions, chunk_size))
+        if not chunk:
+            return
+        yield first_number, chunk
+        first_number += len(chunk)
 
-        code = code_template.replace("{description}", test_description)
-    
-    # Shopping cart template
-    elif "cart" in description_lower or "shopping" in description_lower:
-        code_template = '''"""
-AI-Generated Test: Shopping Cart Functionality
-Generated from: "{description}"
-"""
 
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+def _generate_chunk(first_number, descriptions, output_dir, latency, options, validate=False):
+    """
+    Generate one work unit (may run inside a worker process)
+    Returns (test_number, template_id, saved filename) per test, or, when
+    output_dir is None, (test_number, template_id, code) for a bulk sink.
+    With validate, a test that does not parse is not saved and its entry
+    holds a SyntaxRejection instead.
+    """
+    results = []
+    generated = iter_generate(descriptions, latency, options, encoded=output_dir is not None)
+    for test_number, (description, template_id, chunks) in enumerate(generated, first_number):
+        rejection = (check_syntax(test_number, description, template_id, chunks, options)
+                     if validate else None)
+        if rejection is not None:
+            code = rejection
+        elif output_dir is None:
+            code = "".join(chunks)
+        else:
+            code = save_test_file(chunks, test_number, output_dir, verbose=False, timestamp=False)
+        results.append((test_number, template_id, code))
+    return results
+
+
+def _generate_chunk_in_worker(first_number, descriptions, output_dir, latency, options,
+                              validate=False):
+    """Run one work unit in a pool process and ship its metrics back"""
+    METRICS.reset()
+    results = _generate_chunk(first_number, descriptions, output_dir, latency, options,
+                              validate)
+    return results, METRICS.snapshot()
+
+
+def generate_batch(descriptions, output_dir=".", start=1, latency=0, workers=1,
+                   chunk_size=256, sink=None, options=DEFAULT_OPTIONS, durations=None,
+                   dedupe=None, validate=None, index=None):
+    """
+    Generates and saves one test per description without any prompts
+    Returns the list of saved filenames, in input order
+
+    Test numbers come from the input position, never from completion order,
+    so the same input always produces the same files. With workers > 1 the
+    descriptions are split into chunk_size work units for a process pool.
+    Pass a bulk sink (ArchiveSink, PackedModuleSink) to write into it instead
+    of one file per test; the caller closes the sink. Support files the
+    options need (such as conftest.py) are written first, and with
+    options.shards a shards.json plan last (see plan_shards for durations).
+    With a DescriptionGrouper as dedupe, near-duplicate descriptions get no
+    test of their own and are listed in clusters.json instead. With a
+    SyntaxGate as validate, tests that do not parse are left out and listed
+    in rejected.json. With an ImpactIndex as index, test_index.json maps each
+    test to the routes and elements it touches.
+    """
+    return list(iter_batch(descriptions, output_dir, start, latency, workers,
+                           chunk_size, sink, options, durations, dedupe, validate, index))
 
 
-class TestShoppingCart:
-    """Test suite for shopping cart functionality"""
+def iter_batch(descriptions, output_dir=".", start=1, latency=0, workers=1,
+               chunk_size=256, sink=None, options=DEFAULT_OPTIONS, durations=None,
+               dedupe=None, validate=None, index=None):
+    """
+    Streaming form of generate_batch: yields each saved name in input order
+    Nothing is kept per test once its name is yielded (unless a shard plan
+    or an index needs it), so memory stays flat however many descriptions
+    there are.
+    """
+    directory = output_dir
+    if sink is None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        write_support_files(output_dir, options)
+    else:
+        output_dir = None
+        for name, text in support_files(options).items():
+            sink.add_file(name, text)
+    if dedupe is not None:
+        descriptions = dedupe.unique(descriptions)
+    chunks = _chunked(descriptions, start, chunk_size)
+    planned = [] if options.shards else None
     
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+    def saved(results):
+        for test_number, template_id, code in results:
+            if validate is not None:
+                validate.record(code if isinstance(code, SyntaxRejection) else None)
+            if isinstance(code, SyntaxRejection):
+                if dedupe is not None:
+                    dedupe.files.append(None)
+                continue
+            name = code if sink is None else sink.add(test_number, code)
+            if planned is not None:
+                planned.append((name, template_id))
+            if index is not None:
+                index.add(name, template_id)
+            if dedupe is not None:
+                dedupe.files.append(Path(name).name if sink is None else name)
+            yield name
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    checking = validate is not None
+    if workers <= 1:
+        for first_number, chunk in chunks:
+            yield from saved(_generate_chunk(first_number, chunk, output_dir, latency, options,
+                                             checking))
+        _write_shard_plan(planned, options, durations, directory, sink)
+        _write_cluster_report(dedupe, directory, sink)
+        _write_rejection_report(validate, directory, sink)
+        _write_impact_index(index, directory, sink)
+        return
     
-    def test_add_item_updates_cart_count(self):
-        """
-        Test Case: Verify cart count updates correctly when adding an item
-        """
-        # Navigate to product page
-        self.driver.get("http://localhost:8080/products")
-        
-        # Get initial cart count
-        cart_badge = self.driver.find_element(By.CLASS_NAME, "cart-count")
-        initial_count = int(cart_badge.text) if cart_badge.text else 0
-        
-        # Find and click "Add to Cart" button for first product
-        add_to_cart_btn = self.driver.find_element(
-            By.XPATH, 
-            "//button[contains(@class, 'add-to-cart')][1]"
-        )
-        add_to_cart_btn.click()
-        
-        # Wait for cart count to update
-        WebDriverWait(self.driver, 10).until(
-            lambda d: int(d.find_element(By.CLASS_NAME, "cart-count").text or 0) > initial_count
-        )
-        
-        # Get updated cart count
-        updated_count = int(cart_badge.text)
-        
-        # Verify count increased by 1
-        assert updated_count == initial_count + 1, \\
-               f"Cart count should increase by 1. Expected {initial_count + 1}, got {updated_count}"
-        
-        print(f"✓ Test Passed: Cart count updated from {initial_count} to {updated_count}")
+    # Keep a bounded window of chunks in flight and collect them in
+    # submission order, so huge inputs are never fully materialized
+    # Worker metrics are merged into this process's METRICS
+    def collect(future):
+        results, snapshot = future.result()
+        METRICS.merge(snapshot)
+        return saved(results)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(_render_cache_config(), _backend_config())) as executor:
+        in_flight = deque()
+        for first_number, chunk in chunks:
+            in_flight.append(executor.submit(
+                _generate_chunk_in_worker, first_number, chunk, output_dir, latency, options,
+                checking,
+            ))
+            if len(in_flight) >= workers * 2:
+                yield from collect(in_flight.popleft())
+        while in_flight:
+            yield from collect(in_flight.popleft())
+    
+    _write_shard_plan(planned, options, durations, directory, sink)
+    _write_cluster_report(dedupe, directory, sink)
+    _write_rejection_report(validate, directory, sink)
+    _write_impact_index(index, directory, sink)
 
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-'''
+def _write_shard_plan(tests, options, durations, output_dir, sink):
+    """Emit shards.json next to the tests when sharding is enabled"""
+    if not options.shards:
+        return
+    text = shard_plan_text(tests, options.shards, durations)
+    if sink is None:
+        _write_text_atomic(Path(output_dir) / SHARD_PLAN, text)
+    else:
+        sink.add_file(SHARD_PLAN, text)
 
-        code = code_template.replace("{description}", test_description)
-    
-    # Logout template
-    elif "logout" in description_lower:
-        code_template = '''"""
-AI-Generated Test: Logout Functionality
-Generated from: "{description}"
-"""
 
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+def _write_cluster_report(dedupe, output_dir, sink):
+    """Emit clusters.json next to the tests when near-duplicates were grouped"""
+    if dedupe is None:
+        return
+    if sink is None:
+        _write_text_atomic(Path(output_dir) / CLUSTER_REPORT, dedupe.report_text())
+    else:
+        sink.add_file(CLUSTER_REPORT, dedupe.report_text())
+
+
+def _write_impact_index(index, output_dir, sink):
+    """Emit test_index.json next to the tests when an index was recorded"""
+    if index is None:
+        return
+    if sink is None:
+        _write_text_atomic(Path(output_dir) / IMPACT_INDEX, index.report_text())
+    else:
+        sink.add_file(IMPACT_INDEX, index.report_text())
 
 
-class TestLogout:
-    """Test suite for logout functionality"""
+def _write_rejection_report(validate, output_dir, sink):
+    """Emit rejected.json next to the tests when they were syntax-checked"""
+    if validate is None:
+        return
+    if sink is None:
+        _write_text_atomic(Path(output_dir) / REJECTION_REPORT, validate.report_text())
+    else:
+        sink.add_file(REJECTION_REPORT, validate.report_text())
+
+
+async def agenerate_batch(descriptions, output_dir=".", start=1, latency=0,
+                          concurrency=1000, sink=None, options=DEFAULT_OPTIONS,
+                          durations=None, dedupe=None, validate=None, index=None):
+    """
+    Asyncio variant of generate_batch
+    Up to `concurrency` descriptions are in flight at once, so their latency
+    overlaps; test numbers still follow input order. Results for a bulk sink
+    are re-ordered so the sink always receives tests in input order.
+    """
+    if sink is None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        write_support_files(output_dir, options)
+    else:
+        for name, text in support_files(options).items():
+            sink.add_file(name, text)
     
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+    if dedupe is not None:
+        descriptions = dedupe.unique(descriptions)
+    pending = enumerate(descriptions, start)
+    saved = []
+    finished = {}
+    next_number = start
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    async def worker():
+        nonlocal next_number
+        for test_number, description in pending:
+            template_id, code = await _agenerate_test(description, latency, options)
+            if validate is not None:
+                rejection = check_syntax(test_number, description, template_id, code, options)
+                validate.record(rejection)
+                if rejection is not None:
+                    code = None  # keeps its place in the order, but is not saved
+            if sink is None:
+                filename = None if code is None else save_test_file(
+                    code, test_number, output_dir, verbose=False, timestamp=False
+                )
+                saved.append((test_number, filename, template_id))
+                continue
+            finished[test_number] = (template_id, code)
+            while next_number in finished:
+                template_id, code = finished.pop(next_number)
+                filename = None if code is None else sink.add(next_number, code)
+                saved.append((next_number, filename, template_id))
+                next_number += 1
     
-    def test_logout_clears_session_and_redirects(self):
-        """
-        Test Case: Verify logout clears session and redirects to homepage
-        """
-        # First, login to create a session
-        self.driver.get("http://localhost:8080/login")
-        
-        username_field = self.driver.find_element(By.ID, "username")
-        username_field.send_keys("testuser@example.com")
-        
-        password_field = self.driver.find_element(By.ID, "password")
-        password_field.send_keys("password123")
-        
-        login_button = self.driver.find_element(By.XPATH, "//button[@type='submit']")
-        login_button.click()
-        
-        # Wait for successful login (dashboard appears)
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "dashboard"))
-        )
-        
-        # Click logout button
-        logout_button = self.driver.find_element(By.ID, "logout-btn")
-        logout_button.click()
-        
-        # Wait for redirect to homepage
-        WebDriverWait(self.driver, 10).until(
-            EC.url_to_be("http://localhost:8080/") or 
-            EC.url_contains("/home")
-        )
-        
-        # Verify user is redirected to homepage
-        current_url = self.driver.current_url
-        assert current_url.endswith("/") or "/home" in current_url, \\
-               f"Should redirect to homepage, but got: {current_url}"
-        
-        # Verify session is cleared (try accessing protected page)
-        self.driver.get("http://localhost:8080/dashboard")
-        
-        # Should redirect back to login
-        WebDriverWait(self.driver, 10).until(
-            EC.url_contains("/login")
-        )
-        
-        assert "/login" in self.driver.current_url, \\
-               "Session should be cleared, user should be redirected to login"
-        
-        print("✓ Test Passed: Logout successful, session cleared, redirected to homepage")
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    
+    saved.sort()
+    _write_shard_plan([(filename, template_id) for _, filename, template_id in saved
+                       if filename is not None],
+                      options, durations, output_dir, sink)
+    if dedupe is not None:
+        dedupe.files.extend(Path(filename).name if sink is None and filename is not None
+                            else filename for _, filename, _ in saved)
+        _write_cluster_report(dedupe, output_dir, sink)
+    _write_rejection_report(validate, output_dir, sink)
+    if index is not None:
+        for _, filename, template_id in saved:
+            if filename is not None:
+                index.add(filename, template_id)
+        _write_impact_index(index, output_dir, sink)
+    return [filename for _, filename, _ in saved if filename is not None]
 
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-'''
+def generate_parametrized(descriptions, output_dir=".", options=DEFAULT_OPTIONS,
+                          tests_per_module=500, durations=None, dedupe=None, index=None):
+    """
+    Groups descriptions by template into parametrized modules
+    Every description resolved to the same template becomes one test case of
+    generated_tests_<template>_NNNN.py (see parametrize_test_module), up to
+    tests_per_module cases per module. Each template is rendered once per
+    module instead of once per description, and there is no simulated
+    latency. Returns [(filename, template id, cases), ...] in write order.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_support_files(output_dir, options)
+    if dedupe is not None:
+        descriptions = dedupe.unique(descriptions)
+    
+    pending = {}
+    counts = Counter()
+    written = []
+    
+    def module_name(template_id, number):
+        return f"generated_tests_{template_id}_{number:04d}.py"
+    
+    def flush(template_id):
+        group = pending.pop(template_id)
+        counts[template_id] += 1
+        with METRICS.timed("render"):
+            source = parametrize_test_module(template_id, group, options)
+        path = output_dir / module_name(template_id, counts[template_id])
+        with METRICS.timed("write"):
+            _write_text_atomic(path, source)
+        written.append((str(path), template_id, len(group)))
+    
+    for description in descriptions:
+        with METRICS.timed("match"):
+            template_id = select_template(description)
+        METRICS.count_template(template_id)
+        group = pending.setdefault(template_id, [])
+        group.append(description)
+        if dedupe is not None:
+            dedupe.files.append(module_name(template_id, counts[template_id] + 1))
+        if len(group) >= tests_per_module:
+            flush(template_id)
+    for template_id in list(pending):
+        flush(template_id)
+    
+    _write_shard_plan(written, options, durations, output_dir, None)
+    _write_cluster_report(dedupe, output_dir, None)
+    if index is not None:
+        for filename, template_id, _ in written:
+            index.add(filename, template_id)
+        _write_impact_index(index, output_dir, None)
+    return written
+
+
+def open_sink(output_format, output_dir, tests_per_module=500):
+    """
+    Create the bulk sink for an --output-format value
+    Returns None for "files" (one file per test)
+    """
+    if output_format == "files":
+        return None
+    if output_format in ("zip", "tar"):
+        extension = "zip" if output_format == "zip" else "tar.gz"
+        return ArchiveSink(Path(output_dir) / f"generated_tests.{extension}", output_format)
+    if output_format == "packed":
+        return PackedModuleSink(output_dir, tests_per_module)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+# ============================================================================
+# GENERATOR SERVICE: ONE WARM PROCESS, MANY CLIENTS
+# ============================================================================
 
-        code = code_template.replace("{description}", test_description)
+class ServiceError(Exception):
+    """A request the service answers with an error status"""
     
-    # Generic template for any other description
-    else:
-        code_template = '''"""
-AI-Generated Test: Custom Test Scenario
-Generated from: "{description}"
-"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
 
-import pytest
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+def parse_service_address(address):
+    """"host:port" -> ("tcp", (host, port)); "unix:/path" -> ("unix", path)"""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "localhost", int(port))
 
-class TestCustomScenario:
-    """AI-generated test suite based on user description"""
+
+class GeneratorService:
+    """
+    Serves generation as a JSON API over HTTP/1.1 keep-alive, on TCP or a Unix socket
+    Endpoints: POST /generate {"description", "options"} -> {"template", "code"};
+    POST /generate/batch {"descriptions", "options"} -> {"tests", "support"};
+    GET /health and GET /metrics. Up to `concurrency` requests generate at
+    once and up to `max_pending` more wait; beyond that the service answers
+    503 with Retry-After instead of queueing without bound.
+    Template rendering runs on one dedicated thread (the render cache is not
+    thread-safe), so the event loop keeps answering /health and other
+    clients; a batch is rendered RENDER_CHUNK descriptions at a time, so
+    single requests are not stuck behind a large one.
+    """
     
-    def setup_method(self):
-        """Initialize WebDriver before each test"""
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
+    MAX_BODY = 16 * 1024 * 1024
+    RENDER_CHUNK = 64
     
-    def teardown_method(self):
-        """Clean up after each test"""
-        self.driver.quit()
+    def __init__(self, concurrency=64, max_pending=1000, latency=0, options=DEFAULT_OPTIONS):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.latency = latency
+        self.options = options
+        self.admitted = 0
+        self.served = 0
+        self.rejected = 0
+        self._slots = None
+        self._renderer = None
     
-    def test_custom_scenario(self):
-        """
-        Test Case: {description}
-        
-        This test was automatically generated by AI based on 
-        the provided natural language description.
-        """
-        # Navigate to application
-        self.driver.get("http://localhost:8080/")
-        
-        # AI would analyze the description and generate appropriate
-        # Selenium commands here. For demonstration, this shows
-        # the structure of a well-formed test.
+    def stats(self):
+        return {"in_flight": self.admitted, "served": self.served, "rejected": self.rejected}
+    
+    async def start(self, address):
+        """Start listening; returns the asyncio server"""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        kind, target = parse_service_address(address)
+        if kind == "unix":
+            return await asyncio.start_unix_server(self._handle_connection, path=target)
+        host, port = target
+        return await asyncio.start_server(self._handle_connection, host, port)
+    
+    def close(self):
+        """Stop the render thread once the server is closed"""
+        if self._renderer is not None:
+            self._renderer.shutdown(wait=False, cancel_futures=True)
+            self._renderer = None
+    
+    async def _handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ServiceError as error:
+                    # The stream can't be trusted any more: answer and hang up
+                    await self._write_response(writer, error.status, {"error": str(error)},
+                                               False, {})
+                    break
+                if request is None:
+                    break
+                
+                method, path, body, keep_alive = request
+                try:
+                    status, payload, headers = await self._dispatch(method, path, body)
+                except ServiceError as error:
+                    status, payload, headers = error.status, {"error": str(error)}, {}
+                except BackendError as error:
+                    status, payload, headers = 502, {"error": str(error)}, {}
+                except Exception as error:  # keep serving other requests
+                    status, payload, headers = 500, {"error": f"Generation failed: {error}"}, {}
+                await self._write_response(writer, status, payload, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader):
+        """Read one request: (method, path, body, keep_alive), or None at EOF"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as error:
+            if error.partial.strip():
+                raise ServiceError(400, "Incomplete request") from None
+            return None
+        except asyncio.LimitOverrunError:
+            raise ServiceError(431, "Request headers too large") from None
         
-        # Example: Find and interact with elements
-        # element = self.driver.find_element(By.ID, "element-id")
-        # element.click()
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ")
+        except ValueError:
+            raise ServiceError(400, "Malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
         
-        # Example: Wait for conditions
-        # WebDriverWait(self.driver, 10).until(
-        #     EC.visibility_of_element_located((By.CLASS_NAME, "result"))
-        # )
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ServiceError(400, "Invalid Content-Length") from None
+        if length > self.MAX_BODY:
+            raise ServiceError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
         
-        # Example: Assertions
-        # assert expected_condition, "Error message"
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, path, body, keep_alive
+    
+    async def _write_response(self, writer, status, payload, keep_alive, headers):
+        data = json.dumps(payload).encode("utf-8")
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close",
+        ]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+    
+    async def _dispatch(self, method, path, body):
+        """Route a request; returns (status, JSON payload, extra headers)"""
+        route = path.split("?", 1)[0]
+        if method == "GET" and route == "/health":
+            return 200, {"status": "ok", "backend": _backend.name, **self.stats()}, {}
+        if method == "GET" and route == "/metrics":
+            return 200, {**METRICS.snapshot(), "backend": _backend.stats()}, {}
+        if method != "POST" or route not in ("/generate", "/generate/batch"):
+            return 404, {"error": f"Not found: {method} {route}"}, {}
         
-        print(f"✓ Test structure generated for: {description}")
-        print("Note: Specific element locators would be determined by AI analysis")
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-'''
-
-        code = code_template.replace("{description}", test_description)
+        if self.admitted >= self.concurrency + self.max_pending:
+            self.rejected += 1
+            return 503, {"error": "Service overloaded, retry later"}, {"Retry-After": "1"}
+        self.admitted += 1
+        try:
+            request, options = self._parse_body(body)
+            async with self._slots:
+                if route == "/generate":
+                    payload = await self._generate_one(request, options)
+                else:
+                    payload = await self._generate_many(request, options)
+            self.served += 1
+            return 200, payload, {}
+        finally:
+            self.admitted -= 1
     
-    return code
-
+    def _parse_body(self, body):
+        """Decode the JSON body and its options (merged over the service defaults)"""
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise ServiceError(400, "Body is not valid JSON") from None
+        if not isinstance(request, dict):
+            raise ServiceError(400, "Body must be a JSON object")
+        try:
+            options = replace(self.options, **request.get("options", {}))
+        except (TypeError, ValueError) as error:
+            raise ServiceError(400, f"Invalid options: {error}") from None
+        return request, options
+    
+    async def _generate_one(self, request, options):
+        description = request.get("description")
+        if not isinstance(description, str) or not description.strip():
+            raise ServiceError(400, "'description' must be a non-empty string")
+        if isinstance(_backend, TemplateBackend):
+            await _await_latency(self.latency)
+            template_id, code = (await self._render([description], options))[0]
+        else:
+            template_id, code = await _agenerate_test(description, self.latency, options)
+        return {"template": template_id, "code": code}
+    
+    async def _generate_many(self, request, options):
+        descriptions = request.get("descriptions")
+        if not isinstance(descriptions, list) or not all(
+            isinstance(description, str) and description.strip() for description in descriptions
+        ):
+            raise ServiceError(400, "'descriptions' must be a list of non-empty strings")
+        if isinstance(_backend, TemplateBackend):
+            # Every description's latency runs at once, as in agenerate_batch;
+            # each chunk renders as soon as its own waits are over
+            chunks = [descriptions[start:start + self.RENDER_CHUNK]
+                      for start in range(0, len(descriptions), self.RENDER_CHUNK)]
+            waits = [asyncio.gather(*(_await_latency(self.latency) for _ in chunk))
+                     for chunk in chunks]
+            results = []
+            try:
+                for chunk, wait in zip(chunks, waits):
+                    await wait
+                    results += await self._render(chunk, options)
+            finally:
+                for wait in waits:
+                    wait.cancel()
+        else:
+            # Sent to the model in batches rather than one request each
+            results = await asyncio.to_thread(_backend.generate_many, descriptions, options)
+        tests = [{"template": template_id, "code": code} for template_id, code in results]
+        return {"tests": tests, "support": support_files(options)}
+    
+    async def _render(self, descriptions, options):
+        """[(template id, code), ...] rendered on the render thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._renderer, lambda: [_render_test(description, options)
+                                     for description in descriptions]
+        )
 
-# ============================================================================
-# SAVE GENERATED CODE TO FILE
-# ============================================================================
 
-def save_test_file(code, test_number):
-    """Saves generated test code to a Python file"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"generated_test_{test_number}_{timestamp}.py"
+def run_service(args):
+    """Run the generator service until interrupted"""
+    configure_render_cache(args.cache_size, args.cache_dir)
+    service = GeneratorService(
+        concurrency=args.concurrency, max_pending=args.max_pending,
+        latency=args.latency if args.latency is not None else 0,
+        options=options_from_args(args),
+    )
     
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(code)
+    async def serve():
+        server = await service.start(args.serve)
+        print(f"🛰️  Generator service listening on {args.serve}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
     
-    print(f"💾 Saved to: {filename}")
-    return filename
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n👋 Service stopped after {service.served} request(s).")
 
 
 # ============================================================================
@@ -498,8 +3524,444 @@ def show_menu():
 # MAIN PROGRAM
 # ============================================================================
 
-def main():
-    """Main program loop"""
+def run_batch(args):
+    """Runs batch mode and reports throughput"""
+    descriptions = read_descriptions(args.input, args.format)
+    
+    latency = args.latency if args.latency is not None else 0
+    cache = configure_render_cache(args.cache_size, args.cache_dir)
+    options = options_from_args(args)
+    durations = load_durations(args.durations) if args.durations else None
+    dedupe = DescriptionGrouper(args.dedupe) if args.dedupe is not None else None
+    validate = SyntaxGate() if args.validate else None
+    index = ImpactIndex() if args.index else None
+    
+    if args.output_format == "store":
+        started = time.perf_counter()
+        stats = ContentStore(args.output_dir).sync(descriptions, options, durations, dedupe,
+                                                   validate, index)
+        elapsed = time.perf_counter() - started
+        total = (stats["unchanged"] + stats["written"] + stats["reused"] + stats["grouped"]
+                 + stats["rejected"])
+        print(f"✅ Synced {total} description(s) into {args.output_dir} in {elapsed:.2f}s: "
+              f"{stats['unchanged']} unchanged, {stats['written']} written, "
+              f"{stats['reused']} reused, {stats['grouped']} grouped, "
+              f"{stats['rejected']} rejected, {stats['pruned']} pruned")
+        _print_rejections(validate)
+        _print_index(index)
+        if METRICS.stages:
+            print(f"⏱️  Stages: {METRICS.summary_line()}")
+        return stats
+    
+    if args.output_format == "parametrized":
+        started = time.perf_counter()
+        modules = generate_parametrized(descriptions, args.output_dir, options,
+                                        args.tests_per_module, durations, dedupe, index)
+        elapsed = time.perf_counter() - started
+        generated = sum(cases for _, _, cases in modules)
+        print(f"✅ Generated {generated} test case(s) in {len(modules)} parametrized "
+              f"module(s) into {args.output_dir} in {elapsed:.2f}s")
+        if dedupe is not None:
+            print(f"🔗 Grouped {dedupe.grouped} near-duplicate description(s) into "
+                  f"{len(dedupe.members)} cluster(s), see {CLUSTER_REPORT}")
+        _print_index(index)
+        if METRICS.stages:
+            print(f"⏱️  Stages: {METRICS.summary_line()}")
+        return generated
+    
+    started = time.perf_counter()
+    sink = open_sink(args.output_format, args.output_dir, args.tests_per_module)
+    try:
+        if args.use_async:
+            generated = len(asyncio.run(agenerate_batch(
+                descriptions, args.output_dir, latency=latency,
+                concurrency=args.concurrency, sink=sink, options=options,
+                durations=durations, dedupe=dedupe, validate=validate, index=index,
+            )))
+        else:
+            # Count as we go instead of collecting every filename
+            generated = sum(1 for _ in iter_batch(
+                descriptions, args.output_dir, latency=latency,
+                workers=args.workers, chunk_size=args.chunk_size, sink=sink,
+                options=options, durations=durations, dedupe=dedupe, validate=validate,
+                index=index,
+            ))
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+    if sink is not None:
+        sink.close()
+    elapsed = time.perf_counter() - started
+    
+    rate = generated / elapsed if elapsed > 0 else float("inf")
+    print(f"✅ Generated {generated} test(s) into {args.output_dir} "
+          f"in {elapsed:.2f}s ({rate:.1f} tests/sec)")
+    if dedupe is not None:
+        print(f"🔗 Grouped {dedupe.grouped} near-duplicate description(s) into "
+              f"{len(dedupe.members)} cluster(s), see {CLUSTER_REPORT}")
+    _print_rejections(validate)
+    _print_index(index)
+    if cache is not None and args.workers <= 1 and _backend.name == "template":
+        stats = cache.stats()
+        print(f"🗃️  Render cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+              f"{stats['disk_hits']} from disk")
+    if _backend.name != "template" and args.workers <= 1:
+        stats = _backend.stats()
+        print(f"🧠 Model: {stats['calls']} call(s), {stats['retries']} retried, "
+              f"latency p50 {stats['latency_p50'] * 1e3:.0f}ms / "
+              f"p99 {stats['latency_p99'] * 1e3:.0f}ms, "
+              f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens")
+    if METRICS.stages:
+        print(f"⏱️  Stages: {METRICS.summary_line()}")
+    return generated
+
+
+def run_timeout_suggestions(args):
+    """Print a suggested wait timeout per template from recorded step timings"""
+    timings = load_step_timings(args.suggest_timeouts)
+    suggestions = suggest_timeouts(timings)
+    if not suggestions:
+        print(f"⚠️  No step timings in {args.suggest_timeouts}")
+        return suggestions
+    
+    current = next(iter(suggestions.values()))["current"]
+    print(f"⏱️  Suggested wait timeouts (the suite ran with {current:g}s):")
+    for template_id, suggestion in suggestions.items():
+        if suggestion["timeouts"]:
+            note = f"keep, {suggestion['timeouts']} step(s) timed out"
+        elif suggestion["slowest_step"] is None:
+            note = "no lookups or waits recorded"
+        else:
+            note = f"slowest {suggestion['slowest_seconds']:.2f}s: {suggestion['slowest_step']}"
+        print(f"   {template_id:<16} {suggestion['timeout']:>5g}s  "
+              f"({suggestion['tests']} test(s), {suggestion['steps']} step(s); {note})")
+    return suggestions
+
+
+def run_selection(args):
+    """
+    Print the generated tests a change can affect, one pytest node id per line
+    Reads test_index.json from the output directory; the summary goes to
+    stderr so the list can be passed straight to pytest.
+    """
+    try:
+        index = load_impact_index(args.output_dir)
+    except FileNotFoundError:
+        print(f"❌ No {IMPACT_INDEX} in {args.output_dir}; generate the tests with --index "
+              f"(archives keep it inside, extract it first)", file=sys.stderr)
+        return None
+    changes = args.affected_by.split(",")
+    selected = affected_tests(index, changes)
+    for key in selected:
+        print(Path(args.output_dir) / key)
+    unindexed = {template_id for template_id, targets in index["templates"].items()
+                 if targets.get("unindexed")}
+    blind = sum(1 for template_id in index["tests"].values() if template_id in unindexed)
+    note = f" ({blind} unindexed model test(s) always included)" if blind else ""
+    print(f"🎯 {len(selected)} of {len(index['tests'])} test(s) affected by "
+          f"{', '.join(change.strip() for change in changes if change.strip())}{note}",
+          file=sys.stderr)
+    return selected
+
+
+def _print_index(index):
+    if index is not None:
+        print(f"🗺️  Indexed {len(index.tests)} test(s) by route and element, "
+              f"see {IMPACT_INDEX}")
+
+
+def _print_rejections(validate):
+    """Summarize a validated batch and show the first few rejected tests"""
+    if validate is None:
+        return
+    print(f"🛡️  Syntax check: {validate.checked} test(s) checked, "
+          f"{len(validate.rejected)} rejected, see {REJECTION_REPORT}")
+    for rejection in sorted(validate.rejected, key=lambda r: r.test_number)[:5]:
+        print(f"   ❌ #{rejection.test_number} line {rejection.line}: {rejection.error} "
+              f"({rejection.description[:60]!r})")
+
+
+def options_from_args(args):
+    """Build GenerationOptions from parsed command-line options"""
+    return GenerationOptions(
+        driver=args.driver, waits=args.waits,
+        timeout=args.wait_timeout, poll_interval=args.poll_interval,
+        base_url=args.base_url, base_url_mode=args.base_url_mode,
+        shards=args.shards, tier=args.tier, style=args.style,
+        step_timing=args.step_timing, result_cache=args.result_cache,
+    )
+
+
+def parse_args(argv=None):
+    """Parse command-line options (no options = interactive mode)"""
+    parser = argparse.ArgumentParser(
+        description="AI-Powered Selenium Test Generator (mock version)"
+    )
+    parser.add_argument(
+        "-i", "--input",
+        help="descriptions file for batch mode (JSONL, CSV or text; '-' for stdin)",
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "jsonl", "csv", "text"], default="auto",
+        help="descriptions file format (default: guess from extension)",
+    )
+    parser.add_argument(
+        "-o", "--output-dir", default=".",
+        help="directory for generated test files (default: current directory)",
+    )
+    parser.add_argument(
+        "--output-format", choices=["files", "zip", "tar", "packed", "parametrized", "store"],
+        default="files",
+        help="batch mode: one file per test, a zip/tar.gz archive, packed "
+             "multi-test modules, one parametrized module per template, or an "
+             "incremental content-addressed store (default: files)",
+    )
+    parser.add_argument(
+        "--tests-per-module", type=int, default=500,
+        help="tests per module with --output-format packed or parametrized "
+             "(default: 500)",
+    )
+    parser.add_argument(
+        "--driver", choices=["per-test", "shared"], default="per-test",
+        help="WebDriver lifecycle in generated tests: a new Chrome per test, or a "
+             "pooled session-scoped driver from an emitted conftest.py "
+             "(default: per-test)",
+    )
+    parser.add_argument(
+        "--waits", choices=["implicit", "explicit"], default="implicit",
+        help="implicit wait plus WebDriverWait (classic), or explicit waits only "
+             "so missing elements fail fast (default: implicit)",
+    )
+    parser.add_argument(
+        "--wait-timeout", type=float, default=10,
+        help="timeout in seconds for generated waits (default: 10)",
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=0.5,
+        help="poll interval in seconds for explicit waits (default: 0.5)",
+    )
+    parser.add_argument(
+        "--tier", choices=["browser", "fast"], default="browser",
+        help="Selenium tests, or fast HTTP-only tests that check the same pages "
+             "without a browser (default: browser)",
+    )
+    parser.add_argument(
+        "--style", choices=["inline", "page-objects"], default="inline",
+        help="browser tests with their locators inline, or tests that use the "
+             "page classes of an emitted pages.py (default: inline)",
+    )
+    parser.add_argument(
+        "--base-url", default="http://localhost:8080",
+        help="base URL of the app under test (default: http://localhost:8080)",
+    )
+    parser.add_argument(
+        "--base-url-mode", choices=["fixed", "per-worker"], default="fixed",
+        help="hard-code the base URL in every test, or read it from a base_url "
+             "fixture that gives each pytest-xdist worker its own port "
+             "(default: fixed)",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=0,
+        help="batch mode: partition the suite into N shards of about equal "
+             "run time and emit shards.json (default: 0, no sharding)",
+    )
+    parser.add_argument(
+        "--durations", metavar="PATH",
+        help="recorded test durations (JSON file or .durations/ directory) used "
+             "to balance --shards instead of per-template estimates",
+    )
+    parser.add_argument(
+        "--index", action="store_true",
+        help="batch mode: write test_index.json mapping every test to its "
+             "template and the routes and page elements it touches",
+    )
+    parser.add_argument(
+        "--affected-by", metavar="CHANGES",
+        help="print the tests in the output directory's test_index.json that "
+             "a change to these comma-separated routes (/login), elements "
+             "(#username, .cart-count) or templates can affect",
+    )
+    parser.add_argument(
+        "--step-timing", action="store_true",
+        help="add a plugin to the emitted conftest.py that times every "
+             "navigation, element lookup and wait into .step-timings/",
+    )
+    parser.add_argument(
+        "--result-cache", action="store_true",
+        help="add a plugin to the emitted conftest.py that skips tests which "
+             "passed before on the same file contents and app build "
+             "($GENERATED_TESTS_APP_BUILD)",
+    )
+    parser.add_argument(
+        "--suggest-timeouts", metavar="PATH",
+        help="read step timings (JSON file or .step-timings/ directory) and "
+             "print a suggested wait timeout per template",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="interactive mode: save generated tests without echoing their code",
+    )
+    parser.add_argument(
+        "--dedupe", type=float, nargs="?", const=0.7, default=None, metavar="THRESHOLD",
+        help="batch mode: generate one test per group of near-duplicate "
+             "descriptions (word similarity >= THRESHOLD, default 0.7, and the "
+             "same template) and list the groups in clusters.json",
+    )
+    parser.add_argument(
+        "--validate", action="store_true",
+        help="batch mode: parse every generated test before writing it; tests "
+             "that do not parse are skipped and listed in rejected.json",
+    )
+    parser.add_argument(
+        "--latency", type=parse_latency, default=None,
+        help="simulated AI latency in seconds: '0', '2' or a random range like "
+             "'0.5-3' (default: 0 in batch mode, 2 in interactive mode)",
+    )
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="batch mode: overlap simulated latency with asyncio",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1000,
+        help="maximum in-flight descriptions with --async, or requests "
+             "generating at once with --serve (default: 1000)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="batch mode: generate across N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=256,
+        help="descriptions per worker work unit (default: 256)",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=1024,
+        help="in-memory render cache entries, 0 to disable (default: 1024)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory for the on-disk render cache tier shared across runs",
+    )
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS), default="template",
+        help="where test code comes from: the built-in templates, or a model "
+             "behind an OpenAI-compatible completions API (default: template)",
+    )
+    parser.add_argument(
+        "--model-url", default="http://localhost:8000/v1/completions",
+        help="completions endpoint for --backend http; the key is read from "
+             "$MODEL_API_KEY (default: http://localhost:8000/v1/completions, "
+             "where fake_model_server.py listens)",
+    )
+    parser.add_argument(
+        "--model", default="test-generator",
+        help="model name sent with --backend http (default: test-generator)",
+    )
+    parser.add_argument(
+        "--model-concurrency", type=int, default=8,
+        help="model requests in flight at once, per process (default: 8)",
+    )
+    parser.add_argument(
+        "--model-batch-size", type=int, default=8,
+        help="descriptions sent per model request (default: 8)",
+    )
+    parser.add_argument(
+        "--model-retries", type=int, default=3,
+        help="retries per model request on errors, 429 and 5xx (default: 3)",
+    )
+    parser.add_argument(
+        "--model-timeout", type=float, default=60,
+        help="seconds to wait for one model response (default: 60)",
+    )
+    parser.add_argument(
+        "--serve", metavar="ADDRESS",
+        help="run as a long-lived generation service on HOST:PORT or unix:PATH "
+             "(see generator_client.py)",
+    )
+    parser.add_argument(
+        "--max-pending", type=int, default=1000,
+        help="requests allowed to wait with --serve before answering 503 (default: 1000)",
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="PATH",
+        help="write per-stage timings and template counters as JSON",
+    )
+    parser.add_argument(
+        "--metrics-prom", metavar="PATH",
+        help="write per-stage timings and template counters as a Prometheus textfile",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="run under cProfile and write generator.prof into the output directory",
+    )
+    args = parser.parse_args(argv)
+    if args.backend != "template" and args.output_format == "store":
+        parser.error("--output-format store tracks template versions and needs --backend template")
+    if args.validate and args.output_format == "parametrized":
+        parser.error("--validate checks one test per description; --output-format "
+                     "parametrized stores descriptions as literals that cannot break the code")
+    if args.step_timing and args.tier != "browser":
+        parser.error("--step-timing times Selenium steps and needs --tier browser")
+    if args.backend != "template" and args.output_format == "parametrized":
+        parser.error("--output-format parametrized renders each template once and needs "
+                     "--backend template")
+    return args
+
+
+def configure_backend_from_args(args):
+    """Set up the backend chosen on the command line"""
+    if args.backend == "template":
+        return configure_backend("template")
+    return configure_backend(
+        args.backend, url=args.model_url, model=args.model,
+        concurrency=args.model_concurrency, batch_size=args.model_batch_size,
+        retries=args.model_retries, timeout=args.model_timeout,
+    )
+
+
+def main(argv=None):
+    """
+    Entry point: service mode with --serve, timeout suggestions with
+    --suggest-timeouts, test selection with --affected-by, batch mode with
+    --input, otherwise interactive
+    """
+    args = parse_args(argv)
+    backend = configure_backend_from_args(args)
+    if backend.name != "template" and args.latency is None:
+        args.latency = 0  # a real model has real latency
+    
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        if args.serve:
+            run_service(args)
+        elif args.suggest_timeouts:
+            run_timeout_suggestions(args)
+        elif args.affected_by:
+            run_selection(args)
+        elif args.input:
+            run_batch(args)
+        else:
+            interactive_main(latency=args.latency, options=options_from_args(args),
+                             quiet=args.quiet)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+            stats_path = Path(args.output_dir) / "generator.prof"
+            profiler.dump_stats(stats_path)
+            print(f"📈 Profile saved to: {stats_path}")
+        backend.close()
+        if args.metrics_json:
+            METRICS.write_json(args.metrics_json)
+        if args.metrics_prom:
+            METRICS.write_prometheus(args.metrics_prom)
+
+
+def interactive_main(latency=None, options=DEFAULT_OPTIONS, quiet=False):
+    """Main program loop (quiet=True saves tests without echoing their code)"""
     
     print("\n" + "="*70)
     print("  ℹ️  DEMO MODE - Using Template-Based AI Simulation")
@@ -537,16 +3999,23 @@ def main():
         
         # Generate the test using mock AI
         test_count += 1
-        generated_code = generate_selenium_test_mock(test_description)
+        generated_code = generate_selenium_test_mock(
+            test_description, latency=latency, options=options
+        )
         
         # Display result
-        print("\n" + "="*70)
-        print("✅ GENERATED TEST CODE:")
-        print("="*70 + "\n")
-        print(generated_code)
-        print("\n" + "="*70)
+        if not quiet:
+            with METRICS.timed("print"):
+                print("\n" + "="*70)
+                print("✅ GENERATED TEST CODE:")
+                print("="*70 + "\n")
+                print(generated_code)
+                print("\n" + "="*70)
         
         # Save to file
+        if test_count == 1:
+            for support_path in write_support_files(".", options):
+                print(f"💾 Saved to: {support_path}")
         filename = save_test_file(generated_code, test_count)
         print(f"✅ Test #{test_count} generated successfully!")
         print("="*70)
@@ -0,0 +1,85 @@
+"""
+Benchmark: HTTP model backend throughput and tail latency, offline
+
+Starts fake_model_server.py in-process and pushes the same synthetic corpus
+through HTTPModelBackend at several concurrency x batch-size settings,
+reporting throughput, retries and per-call latency percentiles. Slow tail
+requests and injected errors show how retries and batching affect the tail.
+
+Usage:
+    python benchmarks/bench_backend.py [--tests 2000] [--configs 1x1,8x1,8x8,32x8]
+    python benchmarks/bench_backend.py --server-latency 0.2 --tail-rate 0.02 --error-rate 0.01
+"""
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import ai_test_generator_mock as generator  # noqa: E402
+import fake_model_server  # noqa: E402
+from bench_generator import make_corpus  # noqa: E402
+
+
+def parse_config(text):
+    """"8x4" -> (concurrency 8, batch size 4)"""
+    concurrency, _, batch_size = text.partition("x")
+    return int(concurrency), int(batch_size or 1)
+
+
+def run_config(corpus, url, concurrency, batch_size):
+    """Generate the corpus once; returns (wall seconds, backend stats)"""
+    backend = generator.configure_backend(
+        "http", url=url, concurrency=concurrency, batch_size=batch_size, backoff=0.05,
+    )
+    started = time.perf_counter()
+    for _ in backend.iter_generate(corpus):
+        pass
+    wall = time.perf_counter() - started
+    stats = backend.stats()
+    generator.configure_backend("template")
+    return wall, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000)
+    parser.add_argument("--configs", default="1x1,8x1,8x8,32x8",
+                        help="comma-separated CONCURRENCYxBATCH settings (default: 1x1,8x1,8x8,32x8)")
+    parser.add_argument("--server-latency", type=float, default=0.05,
+                        help="fake model seconds per request (default: 0.05)")
+    parser.add_argument("--tail-rate", type=float, default=0.01,
+                        help="fraction of slow requests (default: 0.01)")
+    parser.add_argument("--tail-latency", type=float, default=0.5,
+                        help="extra seconds for a slow request (default: 0.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests failing with 503 (default: 0)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.tests, args.seed)
+    server = fake_model_server.start_in_thread(
+        latency=args.server_latency, tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency, error_rate=args.error_rate, seed=args.seed,
+    )
+
+    print(f"{'config':<8} {'wall (s)':>9} {'tests/s':>9} {'calls':>6} {'retries':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    try:
+        for config in [text.strip() for text in args.configs.split(",") if text.strip()]:
+            concurrency, batch_size = parse_config(config)
+            wall, stats = run_config(corpus, server.url, concurrency, batch_size)
+            rate = args.tests / wall if wall > 0 else float("inf")
+            print(f"{config:<8} {wall:>9.2f} {rate:>9.1f} {stats['calls']:>6} "
+                  f"{stats['retries']:>8} {stats['latency_p50'] * 1e3:>8.1f} "
+                  f"{stats['latency_p95'] * 1e3:>8.1f} {stats['latency_p99'] * 1e3:>8.1f} "
+                  f"{stats['latency_max'] * 1e3:>8.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Benchmark suite for the generator hot paths
+
+Builds a synthetic corpus that covers every template branch plus the generic
+fallback, then measures each stage separately:
+
+    select    - template selection (keyword matching)
+    render    - filling the selected template
+    generate  - generate_selenium_test_mock end to end (no latency, no cache)
+    save      - save_test_file into a temporary directory
+
+For every stage it reports latency percentiles, throughput and peak traced
+memory. Results can be saved as a baseline and compared on later runs, so
+template or matching changes that slow things down show up as regressions.
+
+Usage:
+    python benchmarks/bench_generator.py --size 10000
+    python benchmarks/bench_generator.py --size 100000 --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_generator.py --size 100000 --compare benchmarks/baseline.json
+"""
+
+from array import array
+from pathlib import Path
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ai_test_generator_mock as generator  # noqa: E402
+
+
+STAGES = ["select", "render", "generate", "save"]
+
+FILLER = [
+    "test", "that", "the", "user", "page", "shows", "a", "message", "when",
+    "clicking", "button", "after", "entering", "data", "and", "checking",
+    "profile", "settings", "result", "list", "item", "correctly", "is",
+]
+
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+
+def make_corpus(size, seed=42):
+    """
+    Returns `size` descriptions, cycling through every template branch and
+    the generic fallback so each one is exercised equally
+    """
+    rng = random.Random(seed)
+    rules = generator.REGISTRY.rules()
+    branches = len(rules) + 1
+
+    corpus = []
+    for index in range(size):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+        branch = index % branches
+        if branch < len(rules):
+            _, groups = rules[branch]
+            for group in groups:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(group))
+        corpus.append(" ".join(words).capitalize())
+    return corpus
+
+
+# ============================================================================
+# STAGE RUNNERS
+# ============================================================================
+
+def _stage_calls(stage, corpus, output_dir):
+    """Returns a one-argument callable per stage and its argument list"""
+    if stage == "select":
+        return generator.select_template, corpus
+
+    if stage == "render":
+        selected = [(generator.select_template(d), d) for d in corpus]
+        return (lambda item: generator.render_template(item[0], item[1])), selected
+
+    if stage == "generate":
+        return (lambda d: generator.generate_selenium_test_mock(
+            d, verbose=False, latency=0)), corpus
+
+    codes = [generator.generate_selenium_test_mock(d, verbose=False, latency=0)
+             for d in corpus]
+    counter = iter(range(1, len(codes) + 1))
+    return (lambda code: generator.save_test_file(
+        code, next(counter), output_dir, verbose=False, timestamp=False)), codes
+
+
+def time_stage(stage, corpus, output_dir):
+    """Time every call of a stage; returns (per-call ns samples, wall seconds)"""
+    call, items = _stage_calls(stage, corpus, output_dir)
+    samples = array("q")
+    clock = time.perf_counter_ns
+
+    started = clock()
+    for item in items:
+        before = clock()
+        call(item)
+        samples.append(clock() - before)
+    wall = (clock() - started) / 1e9
+    return samples, wall
+
+
+def trace_stage_memory(stage, corpus, output_dir):
+    """Peak traced memory (bytes) while running a stage"""
+    call, items = _stage_calls(stage, corpus, output_dir)
+    tracemalloc.start()
+    try:
+        for item in items:
+            call(item)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0
+    index = min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def summarize(samples, wall, peak_bytes):
+    """Latency percentiles (microseconds), throughput and peak memory"""
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "p50_us": percentile(ordered, 0.50) / 1e3,
+        "p90_us": percentile(ordered, 0.90) / 1e3,
+        "p99_us": percentile(ordered, 0.99) / 1e3,
+        "max_us": (ordered[-1] if ordered else 0) / 1e3,
+        "throughput_per_sec": len(ordered) / wall if wall > 0 else 0.0,
+        "peak_memory_kb": peak_bytes / 1024,
+    }
+
+
+def run_suite(size, stages, save_limit, memory_sample, seed=42):
+    """Run the selected stages and return the results dict"""
+    generator.configure_render_cache(0)
+    corpus = make_corpus(size, seed)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_generator_") as output_dir:
+        for stage in stages:
+            stage_corpus = corpus[:save_limit] if stage == "save" else corpus
+            samples, wall = time_stage(stage, stage_corpus, output_dir)
+            peak = trace_stage_memory(stage, stage_corpus[:memory_sample], output_dir)
+            results[stage] = summarize(samples, wall, peak)
+
+    return {
+        "size": size,
+        "seed": seed,
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stages": results,
+    }
+
+
+# ============================================================================
+# REPORTING AND BASELINES
+# ============================================================================
+
+def print_results(results):
+    print(f"\nCorpus: {results['size']} descriptions (seed {results['seed']})")
+    print(f"{'stage':<10} {'calls':>9} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} "
+          f"{'max us':>10} {'ops/sec':>11} {'peak KB':>9}")
+    for stage, row in results["stages"].items():
+        print(f"{stage:<10} {row['calls']:>9} {row['p50_us']:>9.2f} {row['p90_us']:>9.2f} "
+              f"{row['p99_us']:>9.2f} {row['max_us']:>10.2f} "
+              f"{row['throughput_per_sec']:>11.0f} {row['peak_memory_kb']:>9.0f}")
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Returns a list of regression messages: a stage regresses when its p50 or
+    p99 latency grows, or its throughput drops, by more than `tolerance`
+    """
+    regressions = []
+    for stage, row in results["stages"].items():
+        base = baseline["stages"].get(stage)
+        if base is None:
+            continue
+        for metric in ("p50_us", "p99_us"):
+            if base[metric] and row[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{stage}: {metric} {base[metric]:.2f} -> {row[metric]:.2f}"
+                )
+        base_rate = base["throughput_per_sec"]
+        if base_rate and row["throughput_per_sec"] < base_rate * (1 - tolerance):
+            regressions.append(
+                f"{stage}: throughput {base_rate:.0f} -> {row['throughput_per_sec']:.0f}/sec"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generator hot paths")
+    parser.add_argument("--size", type=int, default=10000,
+                        help="number of synthetic descriptions (default: 10000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--save-limit", type=int, default=10000,
+                        help="max files written by the save stage (default: 10000)")
+    parser.add_argument("--memory-sample", type=int, default=10000,
+                        help="descriptions traced for peak memory (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", metavar="PATH",
+                        help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare against a baseline and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="allowed slowdown before flagging a regression (default: 0.20)")
+    args = parser.parse_args(argv)
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    results = run_suite(args.size, stages, args.save_limit, args.memory_sample, args.seed)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Microbenchmark: template selection cost as the number of templates grows
+
+Compares the precompiled KeywordMatcher against the old style of checking
+every rule's keywords with `in` one template after another.
+
+Usage:
+    python benchmarks/bench_matcher.py [--descriptions 2000] [--repeat 5]
+"""
+
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_test_generator_mock import KeywordMatcher, REGISTRY  # noqa: E402
+
+
+TEMPLATE_COUNTS = [6, 50, 200, 800]
+
+WORDS = [
+    "login", "logout", "invalid", "empty", "form", "search", "cart", "shopping",
+    "password", "username", "register", "profile", "checkout", "payment",
+    "coupon", "wishlist", "filter", "sort", "upload", "download", "reset",
+    "email", "verify", "dashboard", "settings", "avatar", "address", "order",
+]
+
+
+def make_rules(count, rng):
+    """The real rules plus synthetic ones up to `count` templates"""
+    rules = REGISTRY.rules()
+    while len(rules) < count:
+        groups = [
+            [f"{rng.choice(WORDS)}{rng.randrange(1000)}"]
+            for _ in range(rng.randint(1, 3))
+        ]
+        rules.append((f"synthetic_{len(rules)}", groups))
+    return rules
+
+
+def make_descriptions(count, rng):
+    """Synthetic descriptions of 8-20 words"""
+    return [
+        "Test that " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        for _ in range(count)
+    ]
+
+
+def linear_select(rules, description):
+    """The old approach: check each rule in order, first match wins"""
+    description_lower = description.lower()
+    for template_id, groups in rules:
+        if all(any(keyword in description_lower for keyword in group) for group in groups):
+            return template_id
+    return "custom"
+
+
+def time_per_call(select, descriptions, repeat):
+    """Best-of-repeat average seconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for description in descriptions:
+            select(description)
+        best = min(best, time.perf_counter() - started)
+    return best / len(descriptions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--descriptions", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    descriptions = make_descriptions(args.descriptions, rng)
+
+    print(f"{'templates':>10} {'linear (us)':>12} {'matcher (us)':>13} {'build (ms)':>11}")
+    for count in TEMPLATE_COUNTS:
+        rules = make_rules(count, rng)
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(rules)
+        build = time.perf_counter() - started
+
+        linear = time_per_call(lambda d: linear_select(rules, d), descriptions, args.repeat)
+        indexed = time_per_call(matcher.best, descriptions, args.repeat)
+        print(f"{count:>10} {linear * 1e6:>12.2f} {indexed * 1e6:>13.2f} {build * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
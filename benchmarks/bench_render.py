@@ -0,0 +1,135 @@
+"""
+Benchmark: render-and-write paths, time and allocation per test
+
+Renders the same synthetic corpus and writes it out three ways:
+
+    joined   - render_template, then write the whole source string (classic)
+    chunks   - render_chunks, text segments written with writelines
+    encoded  - render_encoded, UTF-8 segments written to a binary handle
+               (or, per file, in one os.writev call)
+
+--mode stream writes every test into one open file, isolating render and
+write costs; --mode files saves one file per test with save_test_file, as
+batch mode does. Template selection happens up front in both. For each path
+it reports microseconds per test (untraced) and the transient memory one
+test needs at its peak, traced with tracemalloc.
+
+Usage:
+    python benchmarks/bench_render.py [--tests 20000] [--mode stream|files]
+    python benchmarks/bench_render.py --waits explicit --tier fast
+"""
+
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ai_test_generator_mock as generator  # noqa: E402
+from bench_generator import make_corpus  # noqa: E402
+
+
+def render(path, template_id, description, options):
+    """The code for one test in the form the path writes it"""
+    if path == "joined":
+        return generator.render_template(template_id, description, options)[0]
+    if path == "chunks":
+        return generator.render_chunks(template_id, description, options)[0]
+    return generator.render_encoded(template_id, description, options)[0]
+
+
+class StreamTarget:
+    """Every test goes into one open file"""
+
+    def __init__(self, directory, path):
+        target = Path(directory) / "out.py"
+        if path == "encoded":
+            self.handle = open(target, "wb")
+        else:
+            self.handle = open(target, "w", encoding="utf-8", newline="")
+        self.write_code = self.handle.write if path == "joined" else self.handle.writelines
+
+    def write(self, number, code):
+        self.write_code(code)
+
+    def close(self):
+        self.handle.close()
+
+
+class FilesTarget:
+    """One file per test, saved like batch mode does"""
+
+    def __init__(self, directory, path):
+        self.directory = directory
+
+    def write(self, number, code):
+        generator.save_test_file(code, number, self.directory, verbose=False, timestamp=False)
+
+    def close(self):
+        pass
+
+
+TARGETS = {"stream": StreamTarget, "files": FilesTarget}
+PATHS = ["joined", "chunks", "encoded"]
+
+
+def time_path(path, tests, options, target):
+    """Seconds to render and write every test once"""
+    started = time.perf_counter()
+    for number, (template_id, description) in enumerate(tests, 1):
+        target.write(number, render(path, template_id, description, options))
+    return time.perf_counter() - started
+
+
+def trace_path(path, tests, options, target):
+    """Peak transient bytes per test: (mean, max)"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for number, (template_id, description) in enumerate(tests, 1):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            target.write(number, render(path, template_id, description, options))
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks), max(peaks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=20000)
+    parser.add_argument("--mode", choices=sorted(TARGETS), default="stream")
+    parser.add_argument("--waits", choices=["implicit", "explicit"], default="implicit")
+    parser.add_argument("--tier", choices=["browser", "fast"], default="browser")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    options = generator.GenerationOptions(waits=args.waits, tier=args.tier)
+    corpus = make_corpus(args.tests, args.seed)
+    tests = [(generator.select_template(text), text) for text in corpus]
+    # Warm the registry and option caches so every path starts equal
+    for path in PATHS:
+        render(path, tests[0][0], tests[0][1], options)
+
+    print(f"{len(tests)} tests, mode={args.mode}, waits={args.waits}, tier={args.tier}")
+    print(f"{'path':<8} {'us/test':>8} {'tests/s':>10} {'peak KB avg':>12} {'peak KB max':>12}")
+    for path in PATHS:
+        with tempfile.TemporaryDirectory() as directory:
+            target = TARGETS[args.mode](directory, path)
+            try:
+                elapsed = time_path(path, tests, options, target)
+                mean_peak, max_peak = trace_path(path, tests, options, target)
+            finally:
+                target.close()
+        rate = len(tests) / elapsed if elapsed > 0 else float("inf")
+        print(f"{path:<8} {elapsed / len(tests) * 1e6:>8.2f} {rate:>10.0f} "
+              f"{mean_peak / 1024:>12.2f} {max_peak / 1024:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: browser-tier vs fast-tier generated tests against the stand-in app
+
+Starts standin_app.py in-process, generates the same synthetic corpus once
+per tier and runs each suite with pytest, reporting wall time per test. The
+browser tier needs selenium and Chrome; it is skipped when selenium is not
+installed.
+
+Usage:
+    python benchmarks/bench_tiers.py [--tests 200] [--tiers fast,browser]
+"""
+
+from pathlib import Path
+import argparse
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import ai_test_generator_mock as generator  # noqa: E402
+import standin_app  # noqa: E402
+from bench_generator import make_corpus  # noqa: E402
+
+
+TIERS = ["fast", "browser"]
+
+
+def run_tier(tier, corpus, base_url):
+    """Generate and run one tier's suite; returns (passed, failed, wall seconds)"""
+    options = generator.GenerationOptions(
+        tier=tier, base_url=base_url, driver="shared", waits="explicit"
+    )
+    with tempfile.TemporaryDirectory(prefix=f"bench_tiers_{tier}_") as output_dir:
+        generator.generate_batch(corpus, output_dir, options=options)
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+             "-o", "python_files=generated_test*.py"],
+            cwd=output_dir, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - started
+
+    summary = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    counts = {"passed": 0, "failed": 0}
+    for part in summary.split(","):
+        words = part.split()
+        if len(words) >= 2 and words[1] in counts:
+            counts[words[1]] = int(words[0])
+    return counts["passed"], counts["failed"], wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tests", type=int, default=200)
+    parser.add_argument("--tiers", default=",".join(TIERS),
+                        help=f"comma-separated tiers to run (default: {','.join(TIERS)})")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    generator.configure_render_cache(0)
+    corpus = make_corpus(args.tests, args.seed)
+    server = standin_app.start_in_thread()
+
+    print(f"{'tier':<8} {'passed':>7} {'failed':>7} {'wall (s)':>9} {'ms/test':>9}")
+    try:
+        for tier in [tier.strip() for tier in args.tiers.split(",") if tier.strip()]:
+            if tier == "browser" and importlib.util.find_spec("selenium") is None:
+                print(f"{tier:<8} skipped (selenium is not installed)")
+                continue
+            passed, failed, wall = run_tier(tier, corpus, server.url)
+            per_test = wall / args.tests * 1e3 if args.tests else 0.0
+            print(f"{tier:<8} {passed:>7} {failed:>7} {wall:>9.2f} {per_test:>9.2f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Fake Model Server for the HTTP Backend
+Description: A local stand-in for an OpenAI-compatible completions API, so
+--backend http can be run, load-tested and benchmarked offline. "Completions"
+are the template engine's output for the scenario in each prompt, after a
+configurable delay; slow tail requests, overload (429) and server errors
+(503) can be injected to exercise retries and tail latency.
+
+Usage:
+    python fake_model_server.py                                 # http://localhost:8000
+    python fake_model_server.py --latency 0.2 --tail-rate 0.01 --error-rate 0.02
+    python ai_test_generator_mock.py --backend http --input descriptions.txt -o generated/
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+
+import ai_test_generator_mock as generator
+
+
+# ============================================================================
+# COMPLETIONS
+# ============================================================================
+
+_SCENARIO = re.compile(r"^Scenario: (.*?)\nTest style:", re.MULTILINE | re.DOTALL)
+_OPTIONS = re.compile(r"^Generation options: (.*)$", re.MULTILINE)
+
+
+def count_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return math.ceil(len(text) / 4)
+
+
+def complete(prompt, fenced=False):
+    """The "model" reply to one prompt built by generator.build_prompt"""
+    scenario = _SCENARIO.search(prompt)
+    options = _OPTIONS.search(prompt)
+    if scenario is None:
+        return "# I could not find a test scenario in the prompt.\n"
+    try:
+        settings = json.loads(options.group(1)) if options else {}
+        options = generator.GenerationOptions(**settings)
+    except (TypeError, ValueError):
+        options = generator.DEFAULT_OPTIONS
+
+    description = scenario.group(1)
+    template_id = generator.select_template(description)
+    code = generator.render_template(template_id, description, options)[0]
+    if fenced:
+        return f"Here is the test:\n\n```python\n{code}```\n"
+    return code
+
+
+# ============================================================================
+# REQUEST HANDLING
+# ============================================================================
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    """Serves POST /v1/completions, GET /v1/models and GET /stats"""
+
+    server_version = "FakeModel/1.0"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without TCP_NODELAY the
+    # body waits for the client's delayed ACK (~40ms) on every keep-alive call
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/v1/models":
+            self.respond(200, {"object": "list", "data": [
+                {"id": self.server.model, "object": "model", "owned_by": "fake"}
+            ]})
+        elif self.path == "/stats":
+            self.respond(200, self.server.stats())
+        else:
+            self.respond(404, {"error": {"message": f"Not found: {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path != "/v1/completions":
+            self.respond(404, {"error": {"message": f"Not found: {self.path}"}})
+            return
+        try:
+            request = json.loads(body)
+            prompts = request["prompt"]
+        except (ValueError, KeyError, TypeError):
+            self.respond(400, {"error": {"message": "Body must be JSON with a 'prompt'"}})
+            return
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        if len(prompts) > self.server.max_batch:
+            self.respond(400, {"error": {"message":
+                               f"At most {self.server.max_batch} prompts per request"}})
+            return
+
+        server = self.server
+        if not server.admit():
+            self.respond(429, {"error": {"message": "Too many requests in flight"}},
+                         {"Retry-After": "0.1"})
+            return
+        try:
+            delay, fail = server.draw(len(prompts))
+            time.sleep(delay)
+            if fail:
+                self.respond(503, {"error": {"message": "Injected server error"}},
+                             {"Retry-After": "0.1"})
+                return
+            texts = [complete(prompt, server.fenced) for prompt in prompts]
+        finally:
+            server.release(len(prompts))
+
+        self.respond(200, {
+            "id": f"cmpl-{server.next_id()}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": request.get("model", server.model),
+            "choices": [
+                {"index": index, "text": text, "finish_reason": "stop", "logprobs": None}
+                for index, text in enumerate(texts)
+            ],
+            "usage": {
+                "prompt_tokens": sum(count_tokens(prompt) for prompt in prompts),
+                "completion_tokens": sum(count_tokens(text) for text in texts),
+                "total_tokens": sum(count_tokens(text) for text in prompts + texts),
+            },
+        })
+
+    def respond(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class FakeModelServer(ThreadingHTTPServer):
+    """
+    One fake model endpoint
+    A request takes latency seconds (+/- jitter, as a fraction) plus
+    per_prompt seconds for each prompt after the first in its batch; with
+    probability tail_rate it takes tail_latency longer. error_rate of the
+    requests fail with 503 and, with max_concurrency > 0, requests beyond
+    that many in flight are refused with 429.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.05, jitter=0.2, per_prompt=0.002,
+                 tail_rate=0.0, tail_latency=1.0, error_rate=0.0, max_concurrency=0,
+                 max_batch=64, fenced=False, model="test-generator", seed=None,
+                 verbose=False):
+        super().__init__(address, FakeModelHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.per_prompt = per_prompt
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.fenced = fenced
+        self.model = model
+        self.verbose = verbose
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {"requests": 0, "prompts": 0, "rejected": 0, "errors": 0,
+                        "peak_in_flight": 0}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/completions"
+
+    def admit(self):
+        """Count a request in, or refuse it when max_concurrency are in flight"""
+        with self._lock:
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                self._counts["rejected"] += 1
+                return False
+            self._in_flight += 1
+            self._counts["requests"] += 1
+            self._counts["peak_in_flight"] = max(self._counts["peak_in_flight"],
+                                                 self._in_flight)
+            return True
+
+    def release(self, prompts):
+        with self._lock:
+            self._in_flight -= 1
+            self._counts["prompts"] += prompts
+
+    def draw(self, prompts):
+        """(delay in seconds, whether to fail) for one request"""
+        with self._lock:
+            delay = self.latency * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay += self.per_prompt * (prompts - 1)
+            if self._random.random() < self.tail_rate:
+                delay += self.tail_latency
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self._counts["errors"] += 1
+        return max(0.0, delay), fail
+
+    def next_id(self):
+        with self._lock:
+            return self._counts["requests"]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, in_flight=self._in_flight)
+
+
+def start_in_thread(host="127.0.0.1", port=0, **settings):
+    """Start a server in a background thread (port 0 = any free port)"""
+    server = FakeModelServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible model server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds per request (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.2,
+                        help="random +/- fraction of --latency (default: 0.2)")
+    parser.add_argument("--per-prompt", type=float, default=0.002,
+                        help="extra seconds per additional prompt in a batch (default: 0.002)")
+    parser.add_argument("--tail-rate", type=float, default=0.0,
+                        help="fraction of requests that are slow (default: 0)")
+    parser.add_argument("--tail-latency", type=float, default=1.0,
+                        help="extra seconds for a slow request (default: 1.0)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 503 (default: 0)")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="answer 429 beyond this many requests in flight (default: 0, no limit)")
+    parser.add_argument("--max-batch", type=int, default=64,
+                        help="most prompts accepted per request (default: 64)")
+    parser.add_argument("--fenced", action="store_true",
+                        help="wrap code in markdown fences with some chatter, like a chat model")
+    parser.add_argument("--model", default="test-generator")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = start_in_thread(
+        args.host, args.port, latency=args.latency, jitter=args.jitter,
+        per_prompt=args.per_prompt, tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency, error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency, max_batch=args.max_batch,
+        fenced=args.fenced, model=args.model, seed=args.seed, verbose=args.verbose,
+    )
+    print(f"🧪 Fake model server on http://{args.host}:{args.port}/v1/completions")
+    print("Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stopped after {server.stats()['requests']} request(s).")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
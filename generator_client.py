@@ -0,0 +1,217 @@
+"""
+Thin Client for the Generator Service
+Description: Sends descriptions to a running `ai_test_generator_mock.py --serve`
+process over one keep-alive connection, so each CI job skips interpreter and
+template startup. Standard library only; it does not import the generator.
+
+Usage:
+    python ai_test_generator_mock.py --serve unix:/tmp/generator.sock &
+    python generator_client.py --server unix:/tmp/generator.sock "Test that logout works"
+    python generator_client.py --server localhost:8765 --input descriptions.txt --output-dir generated/
+"""
+
+from itertools import islice
+from pathlib import Path
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sys
+import time
+
+
+class GeneratorServiceError(Exception):
+    """The service rejected a request"""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class GeneratorClient:
+    """
+    Keep-alive client for the generator service
+    A 503 (service overloaded) is retried with jittered exponential backoff,
+    starting from the server's Retry-After; a connection the server closed
+    while idle is reopened transparently.
+    """
+
+    def __init__(self, address="localhost:8765", timeout=60, retries=5):
+        self.address = address
+        self.timeout = timeout
+        self.retries = retries
+        self._connection = None
+
+    def _connect(self):
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        host, _, port = self.address.rpartition(":")
+        return http.client.HTTPConnection(host or "localhost", int(port), timeout=self.timeout)
+
+    def _send(self, method, path, body):
+        """One request/response; reconnects once if a kept-alive connection went stale"""
+        for attempt in (1, 2):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request(method, path, body=body,
+                                         headers={"Content-Type": "application/json"})
+                response = self._connection.getresponse()
+                return response, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def request(self, method, path, payload=None):
+        """Send a JSON request and return the decoded JSON response"""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(self.retries + 1):
+            response, data = self._send(method, path, body)
+            if response.status == 503 and attempt < self.retries:
+                delay = float(response.getheader("Retry-After", "1")) * 2 ** attempt
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                continue
+            result = json.loads(data or b"{}")
+            if response.status != 200:
+                raise GeneratorServiceError(f"{response.status}: {result.get('error')}")
+            return result
+
+    def generate(self, description, **options):
+        """Generate one test; returns (template id, code)"""
+        result = self.request("POST", "/generate",
+                              {"description": description, "options": options})
+        return result["template"], result["code"]
+
+    def generate_batch(self, descriptions, **options):
+        """Generate many tests in one request; returns {"tests": [...], "support": {...}}"""
+        return self.request("POST", "/generate/batch",
+                            {"descriptions": list(descriptions), "options": options})
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _write_atomic(path, text):
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def _description(line):
+    if not line.startswith(("{", '"')):
+        return line
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return line
+    if isinstance(record, dict):
+        record = record.get("description")
+    return record if isinstance(record, str) and record.strip() else line
+
+
+def _read_lines(source):
+    """Descriptions, one per line (JSON lines may be strings or {"description": ...})
+
+    A line that only looks like JSON, or a record without a "description",
+    is taken as plain text.
+    """
+    handle = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield _description(line)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _parse_option(text):
+    """"key=value" -> (key, value); the value is read as JSON when possible"""
+    key, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected key=value, got: {text}")
+    try:
+        return key.replace("-", "_"), json.loads(value)
+    except ValueError:
+        return key.replace("-", "_"), value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Client for the generator service")
+    parser.add_argument("description", nargs="?",
+                        help="generate one test and print it to stdout")
+    parser.add_argument("--server", default="localhost:8765",
+                        help="service address: HOST:PORT or unix:PATH (default: localhost:8765)")
+    parser.add_argument("-i", "--input",
+                        help="descriptions file (text or JSON lines; '-' for stdin)")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="where --input tests are written (default: current directory)")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="descriptions per request with --input (default: 256)")
+    parser.add_argument("--option", type=_parse_option, action="append", default=[],
+                        metavar="KEY=VALUE",
+                        help="generation option, e.g. --option driver=shared --option timeout=5")
+    args = parser.parse_args(argv)
+    if not args.description and not args.input:
+        parser.error("give a description or --input")
+    options = dict(args.option)
+
+    test_number = 0
+    try:
+        with GeneratorClient(args.server) as client:
+            if args.description:
+                print(client.generate(args.description, **options)[1], end="")
+                return 0
+
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            descriptions = _read_lines(args.input)
+            started = time.perf_counter()
+            while True:
+                batch = list(islice(descriptions, args.batch_size))
+                if not batch:
+                    break
+                result = client.generate_batch(batch, **options)
+                if test_number == 0:
+                    for name, text in result["support"].items():
+                        _write_atomic(output_dir / name, text)
+                for test in result["tests"]:
+                    test_number += 1
+                    _write_atomic(output_dir / f"generated_test_{test_number}.py", test["code"])
+            elapsed = time.perf_counter() - started
+            print(f"✅ Generated {test_number} test(s) into {output_dir} in {elapsed:.2f}s")
+    except (GeneratorServiceError, OSError, http.client.HTTPException) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        if args.input:
+            print(f"   {test_number} test file(s) were written before the failure",
+                  file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Stand-in Web App for the Generated Tests
+Description: A tiny local app serving the pages the templates target
+(/login, /register, /search, /products, /dashboard) with the same element
+IDs and classes, so browser-tier and fast-tier tests can run offline
+
+Usage:
+    python standin_app.py                       # http://localhost:8080
+    python standin_app.py --port 9000 --instances 4
+"""
+
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import html
+import json
+import secrets
+import threading
+
+# ============================================================================
+# APP DATA
+# ============================================================================
+
+# The one account that can log in (the logout template uses it)
+USERS = {"testuser@example.com": "password123"}
+
+PRODUCTS = [
+    (1, "Wireless Mouse", "19.99"),
+    (2, "Mechanical Keyboard", "79.00"),
+    (3, "USB-C Hub", "34.50"),
+]
+
+REGISTER_FIELDS = [
+    ("username", "Username", "text"),
+    ("email", "Email", "email"),
+    ("password", "Password", "password"),
+    ("confirm-password", "Confirm password", "password"),
+]
+
+
+class SessionStore:
+    """In-memory sessions keyed by a random cookie token (one store per app instance)"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """Return (token, session), creating a new session for unknown tokens"""
+        with self._lock:
+            if token not in self._sessions:
+                token = secrets.token_hex(16)
+                self._sessions[token] = {"user": None, "cart": 0}
+            return token, self._sessions[token]
+
+    def drop(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+
+# ============================================================================
+# PAGES
+# ============================================================================
+
+def layout(title, body):
+    """Wrap page content in the shared HTML skeleton"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)} - Stand-in App</title>
+</head>
+<body>
+<nav><a href="/">Home</a> <a href="/login">Login</a> <a href="/register">Register</a> <a href="/search">Search</a> <a href="/products">Products</a></nav>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+def login_page(error=None):
+    message = f'<div class="error-message">{html.escape(error)}</div>\n' if error else ""
+    return layout("Login", f"""<h1>Login</h1>
+{message}<form method="post" action="/login">
+<label for="username">Username</label>
+<input id="username" name="username" type="text">
+<label for="password">Password</label>
+<input id="password" name="password" type="password">
+<button type="submit">Log in</button>
+</form>""")
+
+
+def register_page(values=None, errors=None):
+    values = values or {}
+    errors = errors or {}
+    rows = []
+    for name, label, kind in REGISTER_FIELDS:
+        value = html.escape(values.get(name, "")) if kind != "password" else ""
+        error = (f'<span class="validation-error">{html.escape(errors[name])}</span>'
+                 if name in errors else "")
+        rows.append(f'<div class="field"><label for="{name}">{label}</label>'
+                    f'<input id="{name}" name="{name}" type="{kind}" value="{value}">'
+                    f'{error}</div>')
+    # No HTML5 "required" attributes: validation happens on the server, so
+    # browsers and plain HTTP clients see the same error markup
+    return layout("Register", '<h1>Register</h1>\n<form method="post" action="/register">\n'
+                  + "\n".join(rows) + '\n<button type="submit">Create account</button>\n</form>')
+
+
+def search_page(query=None):
+    parts = ['<h1>Search</h1>', '<form method="get" action="/search">',
+             '<input id="search-input" name="q" type="text" '
+             f'value="{html.escape(query or "")}">',
+             '<button id="search-button" type="submit">Search</button>', '</form>']
+    if query is not None and not query.strip():
+        parts.append('<div class="warning-message">Please enter a search term</div>')
+    elif query:
+        matches = [name for _, name, _ in PRODUCTS if query.lower() in name.lower()]
+        items = "".join(f'<li class="result">{html.escape(name)}</li>' for name in matches)
+        parts.append(f'<ul class="results">{items}</ul>' if matches
+                     else '<p class="no-results">No results found</p>')
+    return layout("Search", "\n".join(parts))
+
+
+# Adds to the cart in place (no reload), like a typical shop front end;
+# without JavaScript the form posts and the server redirects back
+CART_SCRIPT = """<script>
+document.querySelectorAll("form.add-to-cart-form").forEach(function (form) {
+  form.addEventListener("submit", function (event) {
+    event.preventDefault();
+    fetch(form.action, {
+      method: "POST",
+      headers: {"Accept": "application/json"},
+      body: new URLSearchParams(new FormData(form))
+    }).then(function (response) { return response.json(); })
+      .then(function (data) {
+        document.querySelector(".cart-count").textContent = data.count;
+      });
+  });
+});
+</script>"""
+
+
+def products_page(cart_count):
+    items = "\n".join(
+        f'<li class="product"><span class="product-name">{html.escape(name)}</span> '
+        f'<span class="price">${price}</span>'
+        f'<form class="add-to-cart-form" method="post" action="/cart/add">'
+        f'<input type="hidden" name="product" value="{product_id}">'
+        f'<button type="submit" class="add-to-cart">Add to Cart</button></form></li>'
+        for product_id, name, price in PRODUCTS
+    )
+    return layout("Products", f"""<h1>Products</h1>
+<div class="cart">Cart: <span class="cart-count">{cart_count}</span></div>
+<ul class="products">
+{items}
+</ul>
+{CART_SCRIPT}""")
+
+
+def dashboard_page(user):
+    return layout("Dashboard", f"""<div id="dashboard">
+<h1>Dashboard</h1>
+<p>Welcome, {html.escape(user)}</p>
+<form method="post" action="/logout"><button id="logout-btn" type="submit">Log out</button></form>
+</div>""")
+
+
+def home_page(user):
+    greeting = f"Signed in as {html.escape(user)}" if user else "Not signed in"
+    return layout("Home", f'<h1>Stand-in App</h1>\n<p class="status">{greeting}</p>')
+
+
+# ============================================================================
+# REQUEST HANDLING
+# ============================================================================
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes requests to the page handlers below"""
+
+    server_version = "StandInApp/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        handler = ROUTES.get((method, url.path))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        self.query = {key: values[-1] for key, values in
+                      parse_qs(url.query, keep_blank_values=True).items()}
+        self.form = {key: values[-1] for key, values in
+                     parse_qs(body, keep_blank_values=True).items()}
+
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        old_token = cookie["session"].value if "session" in cookie else None
+        self.token, self.session = self.server.sessions.get(old_token)
+        self.new_session = self.token != old_token
+
+        if handler is None:
+            self.respond(404, layout("Not found", "<h1>Page not found</h1>"))
+        else:
+            handler(self)
+
+    def respond(self, status, body, content_type="text/html; charset=utf-8", location=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if location is not None:
+            self.send_header("Location", location)
+        if self.new_session:
+            self.send_header("Set-Cookie", f"session={self.token}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location):
+        self.respond(303, "", location=location)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def handle_home(request):
+    request.respond(200, home_page(request.session["user"]))
+
+
+def handle_login(request):
+    if request.command == "GET":
+        request.respond(200, login_page())
+        return
+    username = request.form.get("username", "")
+    if USERS.get(username) == request.form.get("password"):
+        request.session["user"] = username
+        request.redirect("/dashboard")
+    else:
+        request.respond(401, login_page("Incorrect username or password"))
+
+
+def handle_register(request):
+    if request.command == "GET":
+        request.respond(200, register_page())
+        return
+    errors = {
+        name: "This field is required"
+        for name, _, _ in REGISTER_FIELDS
+        if not request.form.get(name, "").strip()
+    }
+    if not errors and request.form["password"] != request.form["confirm-password"]:
+        errors["confirm-password"] = "Passwords do not match"
+    if errors:
+        request.respond(422, register_page(request.form, errors))
+    else:
+        request.redirect("/login")
+
+
+def handle_search(request):
+    request.respond(200, search_page(request.query.get("q")))
+
+
+def handle_products(request):
+    request.respond(200, products_page(request.session["cart"]))
+
+
+def handle_cart_add(request):
+    request.session["cart"] += 1
+    if "application/json" in request.headers.get("Accept", ""):
+        request.respond(200, json.dumps({"count": request.session["cart"]}),
+                        content_type="application/json")
+    else:
+        request.redirect("/products")
+
+
+def handle_dashboard(request):
+    if request.session["user"] is None:
+        request.redirect("/login")
+    else:
+        request.respond(200, dashboard_page(request.session["user"]))
+
+
+def handle_logout(request):
+    request.server.sessions.drop(request.token)
+    request.redirect("/")
+
+
+ROUTES = {
+    ("GET", "/"): handle_home,
+    ("GET", "/login"): handle_login,
+    ("POST", "/login"): handle_login,
+    ("GET", "/register"): handle_register,
+    ("POST", "/register"): handle_register,
+    ("GET", "/search"): handle_search,
+    ("GET", "/products"): handle_products,
+    ("POST", "/cart/add"): handle_cart_add,
+    ("GET", "/dashboard"): handle_dashboard,
+    ("POST", "/logout"): handle_logout,
+}
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class StandInServer(ThreadingHTTPServer):
+    """One app instance with its own sessions"""
+
+    daemon_threads = True
+
+    def __init__(self, address, verbose=False):
+        super().__init__(address, StandInHandler)
+        self.sessions = SessionStore()
+        self.verbose = verbose
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_in_thread(host="127.0.0.1", port=0, verbose=False):
+    """Start an instance in a background thread (port 0 = any free port)"""
+    server = StandInServer((host, port), verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in web app for the generated tests")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="port of the first instance (default: 8080)")
+    parser.add_argument("--instances", type=int, default=1,
+                        help="run N independent instances on consecutive ports, one per "
+                             "pytest-xdist worker with --base-url-mode per-worker (default: 1)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    servers = [start_in_thread(args.host, args.port + index, args.verbose)
+               for index in range(args.instances)]
+    for server in servers:
+        print(f"🌐 Serving stand-in app on http://{args.host}:{server.server_address[1]}")
+    print("Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()